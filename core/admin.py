@@ -4,12 +4,14 @@ from django.urls import reverse
 from django.urls import path
 from django.shortcuts import render, redirect
 from django.contrib import messages
-from django.http import HttpResponse
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.template.response import TemplateResponse
 import csv, logging, openpyxl
 import io
-from .models import Video, Question, Answer, VideoProgress, Certificate
+from .models import Video, Question, Answer, VideoProgress, QuizAttempt, AttemptAnswer, Certificate, ImportJob
 from .forms import BulkQuestionImportForm, QuestionForm, AnswerInlineFormSet, VideoForm
+from .exporters import XLSX_CONTENT_TYPE, export_filename, stream_csv, stream_csv_zip, stream_xlsx
+from .import_jobs import create_import_job, job_state, sweep_jobs
 
 
 class AnswerInline(admin.TabularInline):
@@ -41,6 +43,7 @@ class VideoAdmin(admin.ModelAdmin):
     search_fields = ['title', 'description']
     ordering = ['order']
     change_list_template = "admin/core/video/video_changelist.html"
+    actions = ['export_questions_csv', 'export_questions_xlsx']
 
     def bulk_import_link(self, obj):
         from django.urls import reverse
@@ -75,13 +78,10 @@ class VideoAdmin(admin.ModelAdmin):
         if request.method == 'POST':
             form = BulkQuestionImportForm(request.POST, request.FILES)
             if form.is_valid():
-                csv_file = form.cleaned_data['csv_file']
-                try:
-                    count = self.process_csv_import(csv_file, video)
-                    messages.success(request, f"Imported {count} questions successfully.")
-                    return redirect(reverse('admin:core_video_change', args=[object_id]))
-                except ValueError as e:
-                    messages.error(request, str(e))
+                # The header has been checked; the rows are imported in the background
+                job = create_import_job(video, form.cleaned_data['csv_file'], request.user)
+                messages.info(request, "Upload received. The questions are being imported.")
+                return redirect(reverse('admin:core_importjob_progress', args=[job.id]))
             else:
                 messages.error(request, form.errors.as_ul())
         else:
@@ -99,39 +99,25 @@ class VideoAdmin(admin.ModelAdmin):
             context
         )
 
-    def process_csv_import(self, csv_file, video):
-        csv_file.seek(0)
-        content = csv_file.read().decode('utf-8-sig')
-        reader = csv.DictReader(io.StringIO(content))
-        required_headers = [
-            'question_text', 'question_type', 'answer_1','answer_1_correct', 'answer_2', 'answer_2_correct', 'answer_3', 'answer_3_correct', 'answer_4', 'answer_4_correct',
-        ]
-        print("DEBUG: CSV headers:", reader.fieldnames)
-        if reader.fieldnames != required_headers:
-            raise ValueError(
-                "CSV must contain these headers: " + ", ".join(required_headers)
-            )
-
-        created = 0
-        for row in reader:
-            q = Question.objects.create(
-                video=video,
-                text_raw=row['question_text'].strip(),
-                question_type=row['question_type'].strip(),
-                order=Question.objects.filter(video=video).count() + 1
-            )
-            for i in range(1,5):
-                text = row[f'answer_{i}'].strip()
-                is_corr = str(row[f'answer_{i}_correct']).strip().lower() in ['true','1','yes']
-                Answer.objects.create(
-                    question=q,
-                    text=text,
-                    is_correct=is_corr,
-                    order=i
-                )
-            created += 1
-
-        return created
+    @admin.action(description="Export questions (CSV)")
+    def export_questions_csv(self, request, queryset):
+        videos = list(queryset.order_by('order'))
+        if len(videos) == 1:
+            response = StreamingHttpResponse(stream_csv(videos[0]), content_type='text/csv')
+            filename = export_filename(videos[0], 'csv')
+        else:
+            response = StreamingHttpResponse(stream_csv_zip(videos), content_type='application/zip')
+            filename = 'questions_export.zip'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    @admin.action(description="Export questions (Excel)")
+    def export_questions_xlsx(self, request, queryset):
+        videos = list(queryset.order_by('order'))
+        filename = export_filename(videos[0], 'xlsx') if len(videos) == 1 else 'questions_export.xlsx'
+        response = StreamingHttpResponse(stream_xlsx(videos), content_type=XLSX_CONTENT_TYPE)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
 
     def download_template(self, request):
         header = [
@@ -165,9 +151,79 @@ class VideoProgressAdmin(admin.ModelAdmin):
     search_fields = ['user__username', 'video__title']
     readonly_fields = ['last_attempt', 'attempt_time']
 
+class AttemptAnswerInline(admin.TabularInline):
+    model = AttemptAnswer
+    extra = 0
+    fields = ['question', 'answer', 'answered_at']
+    readonly_fields = ['question', 'answer', 'answered_at']
+
+@admin.register(QuizAttempt)
+class QuizAttemptAdmin(admin.ModelAdmin):
+    inlines = [AttemptAnswerInline]
+    list_display = ['user', 'video', 'number', 'status', 'percentage', 'started_at', 'ended_at']
+    list_filter = ['status', 'video', 'started_at']
+    search_fields = ['user__username', 'video__title']
+    readonly_fields = ['started_at', 'ended_at']
+
 @admin.register(Certificate)
 class CertificateAdmin(admin.ModelAdmin):
     list_display = ['user', 'issue_date', 'file']
     list_filter = ['issue_date']
     search_fields = ['user__username']
-    readonly_fields = ['issue_date']
\ No newline at end of file
+    readonly_fields = ['issue_date']
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = ['video', 'status', 'rows_processed', 'created_count', 'created_by', 'created_at', 'progress_link']
+    list_filter = ['status', 'video']
+    search_fields = ['video__title']
+    readonly_fields = [
+        'video', 'file', 'status', 'created_by', 'rows_processed', 'created_count',
+        'errors', 'message', 'created_at', 'started_at', 'finished_at',
+    ]
+
+    def has_add_permission(self, request):
+        return False  # jobs are created from the Video bulk import page
+
+    def progress_link(self, obj):
+        url = reverse('admin:core_importjob_progress', args=[obj.pk])
+        return format_html('<a href="{}">Progress</a>', url)
+    progress_link.short_description = 'Progress'
+
+    def get_urls(self):
+        urls = super().get_urls()
+        custom = [
+            path(
+                '<int:object_id>/progress/',
+                self.admin_site.admin_view(self.progress_view),
+                name='core_importjob_progress'
+            ),
+            path(
+                '<int:object_id>/progress.json',
+                self.admin_site.admin_view(self.progress_json),
+                name='core_importjob_progress_json'
+            ),
+        ]
+        return custom + urls
+
+    def progress_view(self, request, object_id):
+        job = self.get_object(request, object_id)
+        if job is None:
+            raise Http404
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': f"Importing questions into {job.video.title}",
+            'job': job,
+            'state': job_state(job),
+            'status_url': reverse('admin:core_importjob_progress_json', args=[job.pk]),
+            'video_url': reverse('admin:core_video_change', args=[job.video_id]),
+        }
+        return TemplateResponse(request, "admin/core/importjob/progress.html", context)
+
+    def progress_json(self, request, object_id):
+        sweep_jobs()  # the page polls this, so stuck jobs are noticed while someone watches
+        job = self.get_object(request, object_id)
+        if job is None:
+            raise Http404
+        return JsonResponse(job_state(job))
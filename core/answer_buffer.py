@@ -0,0 +1,103 @@
+"""
+Optional write-behind buffering of quiz answers.
+
+With ``QUIZ_ANSWER_WRITE_BEHIND = True`` each answer click is written to the
+cache, one key per (attempt, question), and the buffered answers for an
+attempt are upserted in one batch at most every
+``QUIZ_ANSWER_FLUSH_INTERVAL`` seconds, on submit and on auto-submit.
+Graders always flush first. Attempts abandoned with answers still buffered
+are flushed by the ``flush_answer_buffers`` management command.
+
+Once a flush commits, the keys it wrote are deleted unless a click has
+replaced them in the meantime, so each flush only writes the answers given
+since the last one. On Redis that compare-and-delete is one atomic script.
+
+Until it is flushed an answer exists only in the cache, so this mode needs
+Redis configured not to evict keys (``core.checks`` refuses other caches).
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .attempts import attempt_answers, record_answers
+from .quiz_bundle import get_quiz_bundle
+
+BUFFER_TIMEOUT = 60 * 60 * 6
+
+
+def write_behind_enabled():
+    return getattr(settings, 'QUIZ_ANSWER_WRITE_BEHIND', False)
+
+
+def _answer_key(attempt_id, question_id):
+    return f'answer_buffer:{attempt_id}:{question_id}'
+
+
+def _flush_lock_key(attempt_id):
+    return f'answer_buffer:{attempt_id}:flushed'
+
+
+def _question_ids(attempt):
+    return get_quiz_bundle(attempt.video_id).questions_by_id.keys()
+
+
+def buffered_answers(attempt):
+    """Answers for an attempt that are waiting in the cache"""
+    keys = {_answer_key(attempt.id, question_id): question_id for question_id in _question_ids(attempt)}
+    return {keys[key]: answer_id for key, answer_id in cache.get_many(keys).items()}
+
+
+_DELETE_IF_EQUAL = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+
+
+def _delete_if_unchanged(key, value):
+    client = getattr(cache, '_cache', None)
+    if hasattr(client, 'get_client'):
+        # RedisCache: compare and delete in one step on the server
+        key = cache.make_and_validate_key(key)
+        client.get_client(key, write=True).eval(_DELETE_IF_EQUAL, 1, key, client._serializer.dumps(value))
+    elif cache.get(key) == value:
+        cache.delete(key)
+
+
+def _forget_flushed(attempt_id, flushed):
+    for question_id, answer_id in flushed.items():
+        _delete_if_unchanged(_answer_key(attempt_id, question_id), answer_id)
+
+
+def flush_answers(attempt):
+    """Upsert the buffered answers of an attempt in one statement and drop them once committed"""
+    if attempt is None or not write_behind_enabled():
+        return {}
+    pending = buffered_answers(attempt)
+    if pending:
+        record_answers(attempt, pending)
+        transaction.on_commit(lambda: _forget_flushed(attempt.id, pending))
+    return pending
+
+
+def discard_buffer(attempt):
+    """Drop an attempt's buffered answers once it has been graded"""
+    if attempt is None or not write_behind_enabled():
+        return
+    cache.delete_many([_answer_key(attempt.id, q) for q in _question_ids(attempt)] + [_flush_lock_key(attempt.id)])
+
+
+def save_answer(attempt, question_id, answer_id):
+    """Record one answer, either straight to the database or through the buffer"""
+    if not write_behind_enabled():
+        record_answers(attempt, {question_id: answer_id})
+        return
+    cache.set(_answer_key(attempt.id, question_id), answer_id, BUFFER_TIMEOUT)
+    # add() only succeeds once the previous flush window has expired
+    interval = getattr(settings, 'QUIZ_ANSWER_FLUSH_INTERVAL', 30)
+    if cache.add(_flush_lock_key(attempt.id), True, interval):
+        flush_answers(attempt)
+
+
+def current_answers(attempt):
+    """{question_id: answer_id} for an attempt, including buffered answers"""
+    answers = attempt_answers(attempt)
+    if attempt is not None and write_behind_enabled():
+        answers.update(buffered_answers(attempt))
+    return answers
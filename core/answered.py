@@ -0,0 +1,69 @@
+"""
+Answered-question counts.
+
+For each open attempt the cache holds a marker per answered question and a
+counter. A click only increments the counter when it is the one that adds
+its question's marker, so concurrent clicks, on any worker, never count a
+question twice or lose one. The counter is touched on every increment, so
+it never expires before a marker does. Keys include the bundle version, so
+a changed question set starts a fresh count. On a miss the markers and the
+counter are rebuilt from the attempt's stored answers the same way, with
+add() and incr(), which keeps them consistent with clicks arriving
+meanwhile.
+"""
+from django.core.cache import cache
+
+from .answer_buffer import current_answers
+
+COUNT_TIMEOUT = 60 * 60 * 6
+
+
+def _count_key(attempt_id, bundle):
+    return f'answered:{attempt_id}:{bundle.version}'
+
+
+def _marker_key(attempt_id, bundle, question_id):
+    return f'answered:{attempt_id}:{bundle.version}:{question_id}'
+
+
+def _mark(attempt_id, bundle, question_id):
+    """Add a question's marker; bump and return the counter only if this call added it"""
+    if not cache.add(_marker_key(attempt_id, bundle, question_id), True, COUNT_TIMEOUT):
+        return None
+    key = _count_key(attempt_id, bundle)
+    count = cache.incr(key)
+    cache.touch(key, COUNT_TIMEOUT)
+    return count
+
+
+def _rebuild(attempt, bundle, answers=None):
+    if answers is None:
+        answers = current_answers(attempt)
+    cache.add(_count_key(attempt.id, bundle), 0, COUNT_TIMEOUT)
+    for question_id in answers.keys() & bundle.positions.keys():
+        _mark(attempt.id, bundle, question_id)
+    return cache.get(_count_key(attempt.id, bundle), 0)
+
+
+def answered_count(attempt, bundle, answers=None):
+    """Number of the bundle's questions answered in an attempt"""
+    if attempt is None:
+        return 0
+    count = cache.get(_count_key(attempt.id, bundle))
+    if count is None:
+        count = _rebuild(attempt, bundle, answers)
+    return count
+
+
+def mark_answered(attempt, bundle, question_id):
+    """Record that a question has been answered and return the answered count"""
+    try:
+        count = _mark(attempt.id, bundle, question_id)
+    except ValueError:
+        # The marker was added but there was no counter yet; rebuilding
+        # skips that marker, so count it afterwards
+        _rebuild(attempt, bundle)
+        count = cache.incr(_count_key(attempt.id, bundle))
+    if count is None:
+        count = answered_count(attempt, bundle)
+    return count
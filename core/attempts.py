@@ -0,0 +1,73 @@
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import AttemptAnswer, QuizAttempt, VideoProgress
+
+
+def start_attempt(progress, video):
+    """
+    Insert the next QuizAttempt and point the progress summary at it.
+
+    The start is claimed with a conditional UPDATE of the progress row, so
+    when two requests start the same quiz at once (a double click, two
+    tabs) only one inserts an attempt; the other waits for it to commit,
+    reloads the progress row and returns the attempt it opened.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        claimed = (
+            VideoProgress.objects
+            .filter(pk=progress.pk, attempts=progress.attempts)
+            .exclude(status__in=['in_progress', 'passed'])
+            .update(attempts=F('attempts') + 1, status='in_progress', started_at=now, ended_at=None)
+        )
+        if not claimed:
+            progress.refresh_from_db()
+            return progress.current_attempt
+
+        attempt = QuizAttempt.objects.create(
+            user_id=progress.user_id,
+            video=video,
+            number=progress.attempts + 1,
+            started_at=now,
+        )
+        progress.attempts = attempt.number
+        progress.started_at = now
+        progress.ended_at = None
+        progress.status = 'in_progress'
+        progress.current_attempt = attempt
+        progress.save(update_fields=['attempts', 'started_at', 'ended_at', 'status', 'current_attempt', 'last_attempt'])
+    return attempt
+
+
+def open_attempt(progress):
+    """The attempt a learner is currently answering, or None"""
+    if progress is None or progress.status != 'in_progress':
+        return None
+    return progress.current_attempt
+
+
+def record_answers(attempt, answers):
+    """
+    Store chosen answers ({question_id: answer_id}) for an attempt.
+
+    One INSERT ... ON CONFLICT DO UPDATE keyed on (attempt, question), so two
+    quick clicks cannot overwrite each other's answers and the attempt row
+    itself is never rewritten.
+    """
+    AttemptAnswer.objects.bulk_create(
+        [
+            AttemptAnswer(attempt_id=attempt.id, question_id=question_id, answer_id=answer_id)
+            for question_id, answer_id in answers.items()
+        ],
+        update_conflicts=True,
+        unique_fields=['attempt', 'question'],
+        update_fields=['answer', 'answered_at'],
+    )
+
+def attempt_answers(attempt):
+    """{question_id: answer_id} for an attempt, or {} when there is none"""
+    if attempt is None:
+        return {}
+    return dict(AttemptAnswer.objects.filter(attempt=attempt).values_list('question_id', 'answer_id'))
@@ -0,0 +1,141 @@
+"""
+Background certificate rendering.
+
+ReportLab rendering is CPU-bound, so instead of drawing the PDF inside the
+request, certificate_view queues it on a small process pool and the browser
+polls a status URL. Only the details and the PDF bytes cross the process
+boundary; the file is stored back in the web process. The pool size caps
+how much CPU rendering can take, so a cohort finishing together queues up
+instead of tying up request workers.
+
+Render processes are started with 'spawn' rather than forked from a web
+worker that may be running threads, and only import the Django-free
+``core.certificate_render``. A pool whose process died is replaced on the
+next render. Job state is kept in the shared cache; when a
+worker finds no job, it reports READY only if a current PDF is stored.
+"""
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from .certificate_render import render_certificate
+from .certificates import (
+    certificate_details, certificate_fingerprint, ensure_certificate_file, is_current, store_certificate_file,
+)
+from .models import Certificate
+
+logger = logging.getLogger(__name__)
+
+READY = 'ready'
+PENDING = 'pending'
+FAILED = 'failed'
+MISSING = 'missing'  # no job and no current PDF; certificate_view queues one
+
+JOB_TIMEOUT = 60 * 10
+FAILED_TIMEOUT = 60  # a failed render may be retried after this
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def render_workers():
+    return getattr(settings, 'CERTIFICATE_RENDER_WORKERS', 2)
+
+
+def render_context():
+    return multiprocessing.get_context('spawn')
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=render_workers(), mp_context=render_context())
+        return _pool
+
+
+def _reset_pool(broken):
+    """Drop a pool whose processes died, so the next render starts a new one"""
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+
+
+def _submit(details):
+    pool = get_pool()
+    try:
+        return pool, pool.submit(render_certificate, details)
+    except BrokenProcessPool:
+        _reset_pool(pool)
+    pool = get_pool()
+    return pool, pool.submit(render_certificate, details)
+
+
+def _job_key(user_id):
+    return f'certificate_job:{user_id}'
+
+
+def job_status(user, certificate):
+    """PENDING or FAILED while a job is known, READY once a current PDF is stored, else MISSING"""
+    status = cache.get(_job_key(user.id))
+    if status:
+        return status
+    if certificate is not None and is_current(certificate, certificate_fingerprint(certificate_details(user, certificate))):
+        return READY
+    return MISSING
+
+
+def _finish(user_id, certificate_id, fingerprint, pool, future):
+    # Runs on the pool's result thread in the web process
+    try:
+        pdf = future.result()
+        certificate = Certificate.objects.get(pk=certificate_id)
+        store_certificate_file(certificate, fingerprint, pdf)
+        cache.delete(_job_key(user_id))
+    except BrokenProcessPool:
+        # Not this certificate's fault: drop the job so the next visit queues it on a new pool
+        logger.exception("The certificate render pool broke while rendering for user %s", user_id)
+        _reset_pool(pool)
+        cache.delete(_job_key(user_id))
+    except Exception:
+        logger.exception("Rendering the certificate for user %s failed", user_id)
+        cache.set(_job_key(user_id), FAILED, FAILED_TIMEOUT)
+    finally:
+        connections.close_all()
+
+
+def enqueue_certificate(user, certificate):
+    """
+    Make sure a current PDF exists or is on its way and return the job status.
+
+    With CERTIFICATE_RENDER_WORKERS = 0 the PDF is rendered in the request.
+    """
+    if not render_workers():
+        ensure_certificate_file(user, certificate)
+        return READY
+
+    details = certificate_details(user, certificate)
+    fingerprint = certificate_fingerprint(details)
+    if is_current(certificate, fingerprint):
+        return READY
+
+    if cache.add(_job_key(user.id), PENDING, JOB_TIMEOUT):
+        try:
+            pool, future = _submit(details)
+        except Exception:
+            # No pool to be had; render here rather than leave the job pending
+            logger.exception("Could not queue the certificate render for user %s", user.id)
+            cache.delete(_job_key(user.id))
+            ensure_certificate_file(user, certificate)
+            return READY
+        future.add_done_callback(partial(_finish, user.id, certificate.id, fingerprint, pool))
+        return PENDING
+    return cache.get(_job_key(user.id)) or PENDING
@@ -0,0 +1,141 @@
+"""
+Certificate PDF rendering.
+
+Only ReportLab and the standard library are imported here, no Django, so
+the render pool's processes can be started with the 'spawn' method and
+load just this module instead of a copy of the web worker.
+"""
+import io
+from functools import lru_cache
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+# Bump when the layout changes so stored certificates are rendered again
+LAYOUT_VERSION = 1
+
+# Colors
+MAIN_COLOR = colors.HexColor("#2B3A67")  # Deep blue
+ACCENT_COLOR = colors.HexColor("#F7C873")  # Gold/yellow
+NAME_BG_COLOR = colors.HexColor("#F7C873")
+
+# Fonts in the order they are first set, so every document gives them the
+# same internal names and the pre-built static layer can refer to them.
+FONTS = ('Helvetica', 'Helvetica-Bold', 'Helvetica-Oblique')
+
+WIDTH, HEIGHT = A4
+NAME_BOX_WIDTH = 400
+NAME_BOX_HEIGHT = 40
+NAME_BOX_Y = HEIGHT - 200
+
+
+def _register_fonts(p):
+    for font in FONTS:
+        p.setFont(font, 12)
+
+
+def draw_static_layer(p):
+    """Everything that is the same on every certificate"""
+    width, height = WIDTH, HEIGHT
+    p.saveState()
+
+    # Border
+    p.setStrokeColor(MAIN_COLOR)
+    p.setLineWidth(8)
+    p.rect(30, 30, width-60, height-60)
+
+    # Header bar
+    p.setFillColor(MAIN_COLOR)
+    p.rect(30, height-120, width-60, 60, fill=1, stroke=0)
+
+    # Title
+    p.setFont("Helvetica-Bold", 32)
+    p.setFillColor(colors.white)
+    p.drawCentredString(width/2, height-80, "Certificate of Achievement")
+
+    # Subtitle
+    p.setFont("Helvetica", 16)
+    p.setFillColor(MAIN_COLOR)
+    p.drawCentredString(width/2, height-150, "This is to certify that")
+
+    # Name box
+    name_box_x = (width - NAME_BOX_WIDTH) / 2
+    p.setFillColor(NAME_BG_COLOR)
+    p.roundRect(name_box_x, NAME_BOX_Y, NAME_BOX_WIDTH, NAME_BOX_HEIGHT, 10, fill=1, stroke=0)
+
+    # Statement
+    p.setFont("Helvetica", 16)
+    p.setFillColor(MAIN_COLOR)
+    p.drawCentredString(width/2, NAME_BOX_Y - 30, "has successfully completed all video quizzes.")
+
+    # Decorative line
+    p.setStrokeColor(ACCENT_COLOR)
+    p.setLineWidth(2)
+    p.line(width/2-120, NAME_BOX_Y - 80, width/2+120, NAME_BOX_Y - 80)
+
+    # Signature
+    p.setFont("Helvetica", 12)
+    p.setFillColor(MAIN_COLOR)
+    p.drawRightString(width-80, 100, "Video Quiz Administrator")
+    p.setStrokeColor(MAIN_COLOR)
+    p.setLineWidth(1)
+    p.line(width-220, 110, width-80, 110)
+
+    p.restoreState()
+
+
+def draw_details(p, details):
+    """The name, course info, date and certificate id"""
+    width = WIDTH
+    p.setFont("Helvetica-Bold", 22)
+    p.setFillColor(MAIN_COLOR)
+    p.drawCentredString(width/2, NAME_BOX_Y + NAME_BOX_HEIGHT/2 + 7, details['name'])
+
+    p.setFont("Helvetica-Oblique", 14)
+    p.drawCentredString(width/2, NAME_BOX_Y - 55, f"Completed {details['video_count']} video quizzes with passing scores")
+
+    p.setFont("Helvetica", 12)
+    p.drawString(80, 100, f"Date: {details['issue_date']}")
+
+    p.setFont("Helvetica", 8)
+    p.setFillColor(colors.gray)
+    p.drawCentredString(width/2, 50, f"Certificate ID: {details['certificate_code']}")
+
+
+@lru_cache(maxsize=1)
+def static_layer():
+    """PDF operators for the static layer, built once per process"""
+    scratch = canvas.Canvas(io.BytesIO(), pagesize=A4)
+    _register_fonts(scratch)
+    start = len(scratch.getCurrentPageContent())
+    draw_static_layer(scratch)
+    return scratch.getCurrentPageContent()[start:]
+
+
+def _new_canvas(buffer):
+    p = canvas.Canvas(buffer, pagesize=A4)
+    _register_fonts(p)
+    return p
+
+
+def render_certificate(details):
+    """Render a certificate PDF from the pre-built static layer and return its bytes"""
+    buffer = io.BytesIO()
+    p = _new_canvas(buffer)
+    p.addLiteral(static_layer())
+    draw_details(p, details)
+    p.showPage()
+    p.save()
+    return buffer.getvalue()
+
+
+def render_certificate_full(details):
+    """Render a certificate drawing every element, as before the static layer existed"""
+    buffer = io.BytesIO()
+    p = canvas.Canvas(buffer, pagesize=A4)
+    draw_static_layer(p)
+    draw_details(p, details)
+    p.showPage()
+    p.save()
+    return buffer.getvalue()
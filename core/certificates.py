@@ -0,0 +1,130 @@
+"""
+Course completion certificates.
+
+The PDF is rendered once and stored on ``Certificate.file`` together with a
+fingerprint of everything printed on it. Downloads stream the stored file;
+it is only rendered again when the fingerprint changes, e.g. after the
+learner's name or the number of videos in the course changes.
+"""
+import hashlib
+import re
+
+from django.core.files.base import ContentFile
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .certificate_render import LAYOUT_VERSION, render_certificate
+from .models import Certificate
+from .outline import get_course_outline
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def latest_certificate(user):
+    """The certificate a user is shown: the most recently issued one, or None"""
+    return Certificate.objects.filter(user=user).order_by('-issue_date', '-id').first()
+
+
+def user_certificate(user):
+    return latest_certificate(user) or Certificate.objects.create(user=user)
+
+
+def certificate_details(user, certificate):
+    """The dynamic text printed on a certificate"""
+    return {
+        'name': user.get_full_name() or user.username,
+        'issue_date': certificate.issue_date.strftime('%Y-%m-%d'),
+        'video_count': len(get_course_outline().video_ids),
+        'certificate_code': f'VQ-{user.id}-{certificate.id}',
+    }
+
+
+def certificate_fingerprint(details):
+    text = '|'.join([str(LAYOUT_VERSION)] + [str(details[key]) for key in sorted(details)])
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def is_current(certificate, fingerprint):
+    return (
+        bool(certificate.file)
+        and certificate.fingerprint == fingerprint
+        and certificate.file.storage.exists(certificate.file.name)
+    )
+
+
+def store_certificate_file(certificate, fingerprint, pdf):
+    """Save rendered PDF bytes on a certificate, replacing any older file"""
+    old_name = certificate.file.name if certificate.file else None
+    certificate.file.save(f'certificate_{certificate.user_id}.pdf', ContentFile(pdf), save=False)
+    certificate.fingerprint = fingerprint
+    certificate.save(update_fields=['file', 'fingerprint'])
+    if old_name and old_name != certificate.file.name:
+        certificate.file.storage.delete(old_name)
+
+
+def ensure_certificate_file(user, certificate=None):
+    """Return the user's Certificate with an up-to-date stored PDF, rendering it here if needed"""
+    if certificate is None:
+        certificate = user_certificate(user)
+    details = certificate_details(user, certificate)
+    fingerprint = certificate_fingerprint(details)
+    if not is_current(certificate, fingerprint):
+        store_certificate_file(certificate, fingerprint, render_certificate(details))
+    return certificate
+
+
+def _byte_range(header, size):
+    """(start, end) for a single 'bytes=' range, or None when it can't be served"""
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        # Suffix range: the last N bytes
+        start = max(0, size - int(last))
+        end = size - 1
+    if start > end or start >= size:
+        return None
+    return start, end
+
+
+def certificate_response(request, certificate, filename):
+    """Serve a stored certificate with validators and single-range support"""
+    storage = certificate.file.storage
+    etag = quote_etag(certificate.fingerprint)
+    last_modified = storage.get_modified_time(certificate.file.name).timestamp()
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        size = certificate.file.size
+        range_header = request.headers.get('Range')
+        if_range = request.headers.get('If-Range')
+        byte_range = None
+        if range_header and (not if_range or if_range == etag):
+            byte_range = _byte_range(range_header, size)
+            if byte_range is None:
+                response = HttpResponse(status=416)
+                response['Content-Range'] = f'bytes */{size}'
+                return response
+
+        if byte_range:
+            start, end = byte_range
+            with certificate.file.open('rb') as f:
+                f.seek(start)
+                data = f.read(end - start + 1)
+            response = HttpResponse(data, status=206, content_type='application/pdf')
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        else:
+            response = FileResponse(
+                certificate.file.open('rb'), as_attachment=True, filename=filename,
+                content_type='application/pdf',
+            )
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Accept-Ranges'] = 'bytes'
+    return response
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+SHARED_CACHE_BACKENDS = ('django.core.cache.backends.redis.RedisCache',)
+
+
+@register()
+def check_answer_buffer_cache(app_configs, **kwargs):
+    """Write-behind answers live only in the cache until flushed, so it must be one that keeps them"""
+    if not getattr(settings, 'QUIZ_ANSWER_WRITE_BEHIND', False):
+        return []
+    backend = settings.CACHES['default']['BACKEND']
+    if backend in SHARED_CACHE_BACKENDS:
+        return []
+    return [Error(
+        f"QUIZ_ANSWER_WRITE_BEHIND needs a Redis cache, not {backend}.",
+        hint="Per-process and culling caches lose buffered answers. Use RedisCache with "
+             "maxmemory-policy noeviction or volatile-*, or turn QUIZ_ANSWER_WRITE_BEHIND off.",
+        id='core.E001',
+    )]
@@ -0,0 +1,70 @@
+from .models import Video
+from .prerequisites import passed_watermark
+from .progress_cache import get_progress_snapshot
+from .stats import COMPLETED_STATUSES, summarise_progress
+
+
+def video_state(video, progress, is_unlocked):
+    """Return (status, can_start, can_retry) for one dashboard row"""
+    if not is_unlocked:
+        return 'locked', False, False
+    if progress and progress.attempts >= video.max_attempts and progress.status != 'passed':
+        return 'max_attempts', False, False
+    if not progress:
+        return 'not_attempted', True, False
+    if progress.status == 'in_progress':
+        return 'in_progress', True, False
+    if progress.status == 'passed':
+        return 'passed', False, False
+    # failed or timeout
+    return 'failed', False, progress.attempts < video.max_attempts
+
+
+def build_dashboard(user):
+    """
+    Build the dashboard context for a user.
+
+    Loads the published videos once, takes the user's progress from the
+    cached snapshot and works out the unlock chain, the button states and
+    the stats from those same rows, so they always agree. The page
+    therefore costs the same number of queries for any course size.
+    """
+    videos = list(Video.objects.filter(is_active=True, status='published').order_by('order'))
+    progress_by_video = get_progress_snapshot(user.id)
+
+    # Videos up to and including the first one not yet passed are unlocked
+    passed_ids = {video_id for video_id, p in progress_by_video.items() if p.status == 'passed'}
+    watermark = passed_watermark([video.id for video in videos], passed_ids)
+
+    video_data = []
+    for index, video in enumerate(videos):
+        progress = progress_by_video.get(video.id)
+        is_unlocked = index <= watermark
+
+        status, can_start, can_retry = video_state(video, progress, is_unlocked)
+
+        attempts_used = progress.attempts if progress else 0
+        retries_remaining = max(0, video.max_attempts - attempts_used)
+        completed = progress is not None and progress.status in COMPLETED_STATUSES
+
+        video_data.append({
+            'video': video,
+            'status': status,
+            'is_unlocked': is_unlocked,
+            'can_start': can_start,
+            'can_retry': can_retry,
+            'attempts_used': attempts_used,
+            'max_attempts': video.max_attempts,
+            'retries_remaining': retries_remaining,
+            'score': progress.score if completed else None,
+            'percentage': progress.percentage if completed else None,
+            'best_score': progress.best_score if progress else 0,
+        })
+
+    stats = summarise_progress(videos, progress_by_video)
+
+    return {
+        'video_data': video_data,
+        'stats': stats,
+        'all_passed': stats['all_passed'],
+    }
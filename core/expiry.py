@@ -0,0 +1,144 @@
+"""
+Server-side expiry of timed-out quiz attempts.
+
+Attempts whose tab was closed never reach auto_submit_quiz, so a worker
+keeps a min-heap of open attempts ordered by deadline
+(``started_at + quiz_timer_seconds``), pops the ones that are due and
+grades and closes them in batches. Each attempt is claimed with a
+conditional UPDATE on its status, so when a learner's own submit closes it
+first the scheduler leaves it, and its progress row, alone. Run it with the
+``expire_quiz_attempts`` management command, once from cron or with
+``--loop`` as a long-running worker.
+"""
+import heapq
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .answer_buffer import discard_buffer, flush_answers
+from .grading import PROGRESS_GRADE_FIELDS, apply_grade, close_attempt, grade_answers
+from .models import AttemptAnswer, QuizAttempt, VideoProgress
+from .progress_cache import invalidate_progress
+from .quiz_bundle import get_quiz_bundle
+
+
+RELOAD_INTERVAL = timedelta(minutes=5)
+
+
+def grace_period():
+    # Leave the browser time to auto-submit with its in-flight answers first
+    return timedelta(seconds=getattr(settings, 'QUIZ_EXPIRY_GRACE_SECONDS', 30))
+
+
+class DeadlineHeap:
+    """
+    Min-heap of (deadline, attempt_id) for open attempts.
+
+    Most loads only fetch ids above the highest one seen so far. Ids don't
+    commit in order (on PostgreSQL a lower id can become visible after a
+    higher one), so every RELOAD_INTERVAL all open attempts are read again
+    and the ones not yet in the heap are added.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._queued = set()
+        self._last_id = 0
+        self._reloaded_at = None
+
+    def __len__(self):
+        return len(self._heap)
+
+    def load_new(self, now=None):
+        """Push attempts started since the last load, or every open attempt when a reload is due"""
+        now = now or timezone.now()
+        rows = QuizAttempt.objects.filter(status='in_progress')
+        if self._reloaded_at is not None and now - self._reloaded_at < RELOAD_INTERVAL:
+            rows = rows.filter(id__gt=self._last_id)
+        else:
+            self._reloaded_at = now
+        rows = rows.order_by('id').values_list('id', 'started_at', 'video__quiz_timer_seconds')
+        for attempt_id, started_at, timer_seconds in rows.iterator():
+            self._last_id = max(self._last_id, attempt_id)
+            if attempt_id not in self._queued:
+                self._queued.add(attempt_id)
+                heapq.heappush(self._heap, (started_at + timedelta(seconds=timer_seconds), attempt_id))
+
+    def pop_due(self, cutoff, limit):
+        due = []
+        while self._heap and self._heap[0][0] <= cutoff and len(due) < limit:
+            attempt_id = heapq.heappop(self._heap)[1]
+            self._queued.discard(attempt_id)
+            due.append(attempt_id)
+        return due
+
+    def next_deadline(self):
+        return self._heap[0][0] if self._heap else None
+
+
+def expire_attempts(attempt_ids, now=None):
+    """Grade and close the given attempts that are still open; returns how many were closed"""
+    now = now or timezone.now()
+    with transaction.atomic():
+        attempts = list(QuizAttempt.objects.filter(id__in=attempt_ids, status='in_progress').select_related('video'))
+        if not attempts:
+            return 0
+
+        for attempt in attempts:
+            flush_answers(attempt)
+        answers = defaultdict(dict)
+        rows = AttemptAnswer.objects.filter(attempt__in=attempts).values_list('attempt_id', 'question_id', 'answer_id')
+        for attempt_id, question_id, answer_id in rows:
+            answers[attempt_id][question_id] = answer_id
+        progress_by_attempt = {
+            p.current_attempt_id: p for p in VideoProgress.objects.filter(current_attempt__in=attempts)
+        }
+
+        closed, progress_rows = [], []
+        for attempt in attempts:
+            grade = grade_answers(get_quiz_bundle(attempt.video_id), answers[attempt.id])
+            progress = progress_by_attempt.get(attempt.id) or VideoProgress()
+            apply_grade(progress, attempt, attempt.video, grade, status='timeout', now=now)
+            # A learner's own submit may have closed it since it was read
+            if not close_attempt(attempt):
+                continue
+            closed.append(attempt)
+            if progress.pk is not None:
+                progress_rows.append(progress)
+            # else the summary has already moved on; only the attempt is closed
+
+        VideoProgress.objects.bulk_update(progress_rows, PROGRESS_GRADE_FIELDS)
+
+    # bulk_update() sends no signals, so drop the snapshots by hand
+    for user_id in {progress.user_id for progress in progress_rows}:
+        invalidate_progress(user_id)
+    for attempt in closed:
+        discard_buffer(attempt)
+    return len(closed)
+
+
+def run_scheduler(batch_size=200, poll_interval=30, once=False, heap=None):
+    """Expire due attempts; with once=False keep sleeping until the next deadline and repeat"""
+    heap = heap or DeadlineHeap()
+    closed = 0
+    while True:
+        heap.load_new()
+        now = timezone.now()
+        while True:
+            due = heap.pop_due(now - grace_period(), batch_size)
+            if not due:
+                break
+            closed += expire_attempts(due, now)
+        if once:
+            return closed
+
+        sleep_for = poll_interval
+        next_deadline = heap.next_deadline()
+        if next_deadline is not None:
+            wait = (next_deadline + grace_period() - timezone.now()).total_seconds()
+            sleep_for = min(poll_interval, max(wait, 0))
+        time.sleep(sleep_for)
@@ -0,0 +1,137 @@
+"""
+Bulk question export.
+
+Writes a video's active questions in the layout the importer reads
+(``QUESTION_HEADERS``), so content can be moved between installations.
+Questions are read with iterator() and their answers prefetched a chunk at
+a time, and output is produced as it is read, so memory use doesn't grow
+with the number of questions.
+
+- CSV: one file for a single video, or a ZIP with one CSV per video.
+- XLSX: one sheet per video. openpyxl's write-only workbook keeps rows in
+  a temporary file, and the finished workbook is streamed from disk.
+"""
+import csv
+import io
+import re
+import tempfile
+import zipfile
+
+import openpyxl
+from django.db.models import Prefetch
+
+from .importers import ANSWER_SLOTS, QUESTION_HEADERS
+from .models import Answer, Question
+
+CHUNK_SIZE = 2000
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+def video_questions(video):
+    return (
+        Question.objects
+        .filter(video=video, is_active=True)
+        .order_by('order', 'id')
+        .prefetch_related(Prefetch('answers', queryset=Answer.objects.order_by('order', 'id')))
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+
+
+def question_row(question):
+    row = [question.text_raw or '', question.question_type]
+    answers = list(question.answers.all())[:ANSWER_SLOTS]
+    for answer in answers:
+        row += [answer.text, 'True' if answer.is_correct else 'False']
+    row += [''] * (len(QUESTION_HEADERS) - len(row))
+    return row
+
+
+def export_filename(video, extension):
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', video.title).strip('_').lower() or f'video_{video.id}'
+    return f'questions_{slug}.{extension}'
+
+
+class _Sink:
+    """Write-only file whose contents are handed out and cleared by take()"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _rows(video):
+    yield QUESTION_HEADERS
+    for question in video_questions(video):
+        yield question_row(question)
+
+
+def stream_csv(video):
+    """Yield a video's questions as CSV text, one row at a time"""
+    sink = io.StringIO()
+    writer = csv.writer(sink)
+    for row in _rows(video):
+        writer.writerow(row)
+        yield sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+
+
+def stream_csv_zip(videos, flush_every=CHUNK_SIZE):
+    """Yield a ZIP archive holding one CSV per video, built as it is sent"""
+    sink = _Sink()
+    used_names = set()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for video in videos:
+            name = export_filename(video, 'csv')
+            if name in used_names:
+                name = f'{name[:-4]}_{video.id}.csv'
+            used_names.add(name)
+            with archive.open(name, 'w') as member:
+                text = io.TextIOWrapper(member, encoding='utf-8', newline='')
+                writer = csv.writer(text)
+                for count, row in enumerate(_rows(video), start=1):
+                    writer.writerow(row)
+                    if count % flush_every == 0:
+                        text.flush()
+                        yield sink.take()
+                text.flush()
+                text.detach()
+            yield sink.take()
+    yield sink.take()
+
+
+def _sheet_title(video, used):
+    title = re.sub(r'[\[\]:*?/\\]', ' ', video.title).strip()[:31] or f'Video {video.id}'
+    candidate, n = title, 2
+    while candidate in used:
+        suffix = f' ({n})'
+        candidate, n = title[:31 - len(suffix)] + suffix, n + 1
+    used.add(candidate)
+    return candidate
+
+
+def stream_xlsx(videos, block_size=64 * 1024):
+    """Yield an .xlsx workbook with one sheet per video"""
+    workbook = openpyxl.Workbook(write_only=True)
+    used_titles = set()
+    for video in videos:
+        sheet = workbook.create_sheet(_sheet_title(video, used_titles))
+        for row in _rows(video):
+            sheet.append(row)
+
+    with tempfile.TemporaryFile() as output:
+        workbook.save(output)
+        output.seek(0)
+        while block := output.read(block_size):
+            yield block
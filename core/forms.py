@@ -2,8 +2,7 @@ from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
 from .models import Video, Question, Answer, VideoProgress
-import csv
-import io
+from .importers import QuestionImportError, open_question_file
 
 class RegisterForm(UserCreationForm):
     email = forms.EmailField(required=True)
@@ -57,7 +56,7 @@ class QuizAnswerForm(forms.Form):
 class BulkQuestionImportForm(forms.Form):
     csv_file = forms.FileField(
         label='CSV File or Excel File',
-        help_text='Upload a CSV file with questions and answers. See template for format.'
+        help_text='Upload a CSV or .xlsx file with questions and answers. See template for format.'
     )
     video = forms.ModelChoiceField(
         queryset=Video.objects.filter(is_active=True),
@@ -67,36 +66,12 @@ class BulkQuestionImportForm(forms.Form):
     
     def clean_csv_file(self):
         file = self.cleaned_data['csv_file']
-        print("DEBUG: File name:", file.name)
-        if not file.name.endswith('.csv'):
-            raise forms.ValidationError('File must be a CSV file.')
-        
-        # Read and validate CSV structure
-        file.seek(0)
+        # Only the header is checked here; the upload is stored on an
+        # ImportJob and its rows are read by the background import
         try:
-            content = file.read().decode('utf-8')
-        except UnicodeDecodeError as e:
-            raise forms.ValidationError(
-            f"File is not UTF-8 encoded. Please save your CSV as UTF-8. Error: {e}"
-        )
-        csv_data = csv.reader(io.StringIO(content))
-        
-        headers = next(csv_data, None)
-        print("DEBUG: Headers from uploaded CSV:", headers)
-        expected_headers = [
-            'question_text', 'question_type', 
-            'answer_1', 'answer_1_correct',
-            'answer_2', 'answer_2_correct', 
-            'answer_3', 'answer_3_correct',
-            'answer_4', 'answer_4_correct'
-        ]
-        
-        if headers != expected_headers:
-            raise forms.ValidationError(
-                f'CSV must contain these headers (in order): {", ".join(expected_headers)}'
-            )
-        
-        file.seek(0)
+            open_question_file(file).close()
+        except QuestionImportError as e:
+            raise forms.ValidationError(str(e))
         return file
 
 class QuestionForm(forms.ModelForm):
@@ -0,0 +1,161 @@
+from dataclasses import dataclass
+
+from django.utils import timezone
+
+from .models import Answer, Question, QuizAttempt
+
+
+@dataclass(frozen=True)
+class QuestionResult:
+    question_id: int
+    answer_id: int
+    correct_answer_id: int
+    is_correct: bool
+
+
+@dataclass(frozen=True)
+class GradeResult:
+    correct_count: int
+    total: int
+    percentage: float
+    results: tuple  # QuestionResult per bundle question, in quiz order
+
+    def snapshot(self):
+        """Compact JSON form stored on QuizAttempt.results"""
+        return [
+            [r.question_id, r.answer_id, r.correct_answer_id, int(r.is_correct)]
+            for r in self.results
+        ]
+
+
+def results_from_snapshot(snapshot):
+    return tuple(
+        QuestionResult(question_id, answer_id, correct_answer_id, bool(is_correct))
+        for question_id, answer_id, correct_answer_id, is_correct in snapshot
+    )
+
+
+def _normalise_answers(answers):
+    """Turn a stored {question_id: answer_id} dict into integer pairs"""
+    chosen = {}
+    for question_id, answer_id in answers.items():
+        try:
+            chosen[int(question_id)] = int(answer_id)
+        except (TypeError, ValueError):
+            continue
+    return chosen
+
+
+def grade_answers(bundle, answers):
+    """
+    Grade a learner's answers against a quiz bundle.
+
+    The score is the size of the intersection between the chosen
+    (question, answer) pairs and the bundle's correct pairs, so grading
+    touches no database tables.
+    """
+    chosen = _normalise_answers(answers)
+    correct_pairs = set(chosen.items()) & bundle.correct_pairs
+
+    results = []
+    for question in bundle.questions:
+        answer_id = chosen.get(question.id)
+        correct_answer = question.correct_answer
+        results.append(QuestionResult(
+            question_id=question.id,
+            answer_id=answer_id,
+            correct_answer_id=correct_answer.id if correct_answer else None,
+            is_correct=(question.id, answer_id) in correct_pairs,
+        ))
+
+    total = len(bundle.questions)
+    correct_count = len(correct_pairs)
+    return GradeResult(
+        correct_count=correct_count,
+        total=total,
+        percentage=(correct_count / total * 100) if total > 0 else 0,
+        results=tuple(results),
+    )
+
+
+ATTEMPT_GRADE_FIELDS = ['score', 'percentage', 'status', 'results', 'ended_at']
+PROGRESS_GRADE_FIELDS = ['score', 'percentage', 'status', 'passed', 'ended_at', 'best_score']
+
+
+def apply_grade(progress, attempt, video, grade, status=None, now=None):
+    """Copy a GradeResult onto an attempt and its progress summary without saving"""
+    passed = grade.percentage >= video.passing_score
+    status = status or ('passed' if passed else 'failed')
+    now = now or timezone.now()
+
+    attempt.score = grade.correct_count
+    attempt.percentage = grade.percentage
+    attempt.status = status
+    attempt.results = grade.snapshot()
+    attempt.ended_at = now
+
+    progress.score = grade.correct_count
+    progress.percentage = grade.percentage
+    progress.status = status
+    progress.passed = passed
+    progress.ended_at = now
+
+    # Update best score
+    if grade.percentage > progress.best_score:
+        progress.best_score = int(grade.percentage)
+
+
+def close_attempt(attempt):
+    """
+    Save a graded attempt only while it is still in progress.
+
+    The conditional UPDATE is the claim: when a submit, an auto-submit and
+    the expiry scheduler race, exactly one of them matches the row and the
+    others get False and leave it alone.
+    """
+    fields = {name: getattr(attempt, name) for name in ATTEMPT_GRADE_FIELDS}
+    return bool(QuizAttempt.objects.filter(pk=attempt.pk, status='in_progress').update(**fields))
+
+
+def record_grade(progress, video, grade, status=None):
+    """
+    Close the progress row's current attempt with a GradeResult and update
+    the summary. Returns False, saving nothing, when the attempt had
+    already been closed elsewhere.
+    """
+    attempt = progress.current_attempt
+    apply_grade(progress, attempt, video, grade, status)
+    if not close_attempt(attempt):
+        return False
+    progress.save(update_fields=PROGRESS_GRADE_FIELDS + ['last_attempt'])
+    return True
+
+
+def result_rows(bundle, results):
+    """
+    Template rows for a sequence of QuestionResults.
+
+    Texts come from the bundle; questions or answers that have left it since
+    the attempt was graded are fetched with one in_bulk() query each.
+    """
+    missing_questions = {r.question_id for r in results} - bundle.questions_by_id.keys()
+    answer_ids = {r.answer_id for r in results} | {r.correct_answer_id for r in results}
+    missing_answers = answer_ids - bundle.answers_by_id.keys() - {None}
+
+    questions = dict(bundle.questions_by_id)
+    answers = dict(bundle.answers_by_id)
+    if missing_questions:
+        questions.update(Question.objects.in_bulk(missing_questions))
+    if missing_answers:
+        answers.update(Answer.objects.in_bulk(missing_answers))
+
+    return [
+        {
+            'question': questions.get(r.question_id),
+            'user_answer': answers.get(r.answer_id),
+            'correct_answer': answers.get(r.correct_answer_id),
+            'is_correct': r.is_correct,
+        }
+        for r in results
+        if r.question_id in questions
+    ]
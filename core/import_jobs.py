@@ -0,0 +1,222 @@
+"""
+Background question imports.
+
+The admin stores the upload on an ImportJob and returns straight away; the
+import itself runs on a small thread pool in the web process, or in the
+``run_import_jobs`` management command when QUESTION_IMPORT_WORKERS is 0.
+A job is claimed with a conditional UPDATE, so the pool and any number of
+command workers never run the same job twice. Imports into different
+videos run side by side; import_rows() locks the video row, so two imports
+into the same video take turns. SQLite allows a single writer, so there the
+pool's imports run one at a time.
+
+The import writes inside one transaction, so rows read so far are reported
+through the shared cache, where the admin progress page can see them before
+the transaction commits, together with a heartbeat. When a process is
+restarted mid-import its transaction is rolled back and its pool's queue is
+lost; recover_jobs() fails running jobs whose heartbeat has stopped and
+finds queued jobs nobody picked up. The ``run_import_jobs --loop`` worker
+does this on every pass, which makes it the safer choice in production; in
+pool mode sweep_jobs() runs it from uploads and progress polls.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, connections, transaction
+from django.utils import timezone
+
+from .importers import QuestionImportError, import_rows, open_question_file
+from .models import ImportJob
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_TIMEOUT = 60 * 60
+HEARTBEAT_TIMEOUT = 60 * 15  # refreshed after every chunk; generous for jobs waiting on a video lock
+QUEUED_GRACE = 60  # queued this long in pool mode means the pool that had it is gone
+SWEEP_INTERVAL = 30
+MAX_STORED_ERRORS = 100
+INTERRUPTED_MESSAGE = "The import was interrupted before it finished and nothing was imported. Upload the file again."
+
+_pool = None
+_pool_lock = threading.Lock()
+_submitted = set()  # job ids waiting in this process's pool
+_sqlite_write_lock = threading.Lock()
+
+
+def import_workers():
+    return getattr(settings, 'QUESTION_IMPORT_WORKERS', 2)
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=import_workers(), thread_name_prefix='question-import')
+        return _pool
+
+
+def _progress_key(job_id):
+    return f'import_job:{job_id}:rows'
+
+
+def _heartbeat_key(job_id):
+    return f'import_job:{job_id}:alive'
+
+
+def _report_progress(job_id, rows):
+    cache.set(_progress_key(job_id), rows, PROGRESS_TIMEOUT)
+    cache.set(_heartbeat_key(job_id), True, HEARTBEAT_TIMEOUT)
+
+
+def rows_processed(job):
+    if job.finished:
+        return job.rows_processed
+    return cache.get(_progress_key(job.id), job.rows_processed)
+
+
+def job_state(job):
+    """JSON-friendly status for the admin progress page"""
+    return {
+        'id': job.id,
+        'status': job.status,
+        'status_display': job.get_status_display(),
+        'finished': job.finished,
+        'rows_processed': rows_processed(job),
+        'created_count': job.created_count,
+        'errors': job.errors,
+        'message': job.message,
+    }
+
+
+def create_import_job(video, uploaded_file, user=None):
+    """Store an upload as a queued job and hand it to the pool once committed"""
+    job = ImportJob.objects.create(video=video, file=uploaded_file, created_by=user)
+    if import_workers():
+        transaction.on_commit(lambda: (_submit(job.id), sweep_jobs()))
+    return job
+
+
+def _submit(job_id):
+    with _pool_lock:
+        if job_id in _submitted:
+            return
+        _submitted.add(job_id)
+    get_pool().submit(_run_in_thread, job_id)
+
+
+def _run_in_thread(job_id):
+    try:
+        run_import_job(job_id)
+    finally:
+        with _pool_lock:
+            _submitted.discard(job_id)
+        connections.close_all()
+
+
+def _write_lock():
+    return _sqlite_write_lock if connection.vendor == 'sqlite' else nullcontext()
+
+
+def _finish(job, status, **fields):
+    for name, value in fields.items():
+        setattr(job, name, value)
+    job.status = status
+    job.finished_at = timezone.now()
+    # The upload is not needed once the job is over
+    if job.file:
+        job.file.delete(save=False)
+    job.save(update_fields=['status', 'finished_at', 'file', *fields])
+    cache.delete_many([_progress_key(job.id), _heartbeat_key(job.id)])
+
+
+def run_import_job(job_id):
+    """Run one queued job; returns False when another worker already claimed it"""
+    claimed = ImportJob.objects.filter(pk=job_id, status='queued').update(
+        status='running', started_at=timezone.now(),
+    )
+    if not claimed:
+        return False
+
+    job = ImportJob.objects.select_related('video').get(pk=job_id)
+    _report_progress(job.id, 0)
+    try:
+        with _write_lock(), job.file.open('rb'):
+            result = import_rows(
+                job.video, open_question_file(job.file),
+                progress=lambda rows: _report_progress(job.id, rows),
+            )
+    except QuestionImportError as e:
+        _finish(job, 'failed', message=str(e))
+    except Exception as e:
+        logger.exception("Question import job %s failed", job.id)
+        _finish(job, 'failed', message=f"Import failed: {e}")
+    else:
+        if result.ok:
+            _finish(job, 'succeeded', rows_processed=result.rows, created_count=result.created,
+                    message=f"Imported {result.created} questions.")
+        else:
+            _finish(job, 'failed', rows_processed=result.rows,
+                    errors=[str(e) for e in result.errors[:MAX_STORED_ERRORS]],
+                    message="Nothing was imported; fix the rows listed below and upload the file again.")
+    return True
+
+
+def recover_jobs(now=None):
+    """
+    Fail running jobs whose worker has stopped and return the ids of queued
+    jobs that have waited longer than QUEUED_GRACE, oldest first.
+
+    A job whose worker is only slow, not gone, still records its real
+    outcome when it finishes.
+    """
+    now = now or timezone.now()
+    running = list(
+        ImportJob.objects
+        .filter(status='running', started_at__lt=now - timedelta(seconds=HEARTBEAT_TIMEOUT))
+        .values_list('id', flat=True)
+    )
+    alive = cache.get_many([_heartbeat_key(job_id) for job_id in running])
+    stale = [job_id for job_id in running if _heartbeat_key(job_id) not in alive]
+    if stale:
+        logger.warning("Failing question import jobs %s: their worker stopped", stale)
+        ImportJob.objects.filter(pk__in=stale, status='running').update(
+            status='failed', finished_at=now, message=INTERRUPTED_MESSAGE,
+        )
+        for job in ImportJob.objects.filter(pk__in=stale, status='failed').exclude(file=''):
+            job.file.delete(save=False)
+            ImportJob.objects.filter(pk=job.pk).update(file='')
+    return list(
+        ImportJob.objects
+        .filter(status='queued', created_at__lt=now - timedelta(seconds=QUEUED_GRACE))
+        .order_by('created_at')
+        .values_list('id', flat=True)
+    )
+
+
+def sweep_jobs():
+    """In pool mode, recover jobs at most every SWEEP_INTERVAL seconds and resubmit leftover queued ones"""
+    if not import_workers() or not cache.add('import_jobs:sweep', True, SWEEP_INTERVAL):
+        return
+    for job_id in recover_jobs():
+        _submit(job_id)
+
+
+def run_queued_jobs(poll_interval=5, once=False):
+    """Work through queued jobs oldest first; with once=False keep polling for new ones"""
+    processed = 0
+    while True:
+        recover_jobs()
+        job_ids = list(ImportJob.objects.filter(status='queued').order_by('created_at').values_list('id', flat=True))
+        for job_id in job_ids:
+            if run_import_job(job_id):
+                processed += 1
+        if once:
+            return processed
+        if not job_ids:
+            time.sleep(poll_interval)
@@ -0,0 +1,281 @@
+"""
+Bulk question import.
+
+Rows are read from the upload as a text stream, validated a chunk at a time
+and written with bulk_create inside one transaction, so an import costs a
+few statements per chunk instead of six per question, and either lands
+completely or not at all. bulk_create() sends no signals, so the video's
+quiz bundle is invalidated here once the rows are in.
+
+SQLite has a single writer, so while a large import's transaction is open
+other writes wait for it and fail with "database is locked" after the
+connection timeout (5 seconds by default). Sites that import large files
+while learners are taking quizzes should run on PostgreSQL.
+"""
+import csv
+import io
+import os
+import zipfile
+from dataclasses import dataclass, field
+
+import openpyxl
+from openpyxl.utils.exceptions import InvalidFileException
+
+from django.db import transaction
+from django.db.models import F, Max
+
+from .models import Answer, Question, Video
+from .quiz_bundle import invalidate_quiz_bundle
+
+QUESTION_HEADERS = [
+    'question_text', 'question_type',
+    'answer_1', 'answer_1_correct',
+    'answer_2', 'answer_2_correct',
+    'answer_3', 'answer_3_correct',
+    'answer_4', 'answer_4_correct',
+]
+ANSWER_SLOTS = 4
+TRUE_VALUES = {'true', '1', 'yes'}
+QUESTION_TYPES = {key for key, _ in Question.QUESTION_TYPES}
+ANSWER_TEXT_MAX_LENGTH = Answer._meta.get_field('text').max_length
+
+CHUNK_SIZE = 500
+MAX_ERRORS = 100  # stop collecting after this many bad rows
+
+
+class QuestionImportError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class RowError:
+    line: int
+    message: str
+
+    def __str__(self):
+        return f"Row {self.line}: {self.message}"
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    rows: int = 0
+    errors: list = field(default_factory=list)
+
+    @property
+    def ok(self):
+        return not self.errors
+
+
+def check_header(header):
+    if header is None or [h.strip() for h in header] != QUESTION_HEADERS:
+        raise QuestionImportError(
+            'File must contain these headers (in order): ' + ', '.join(QUESTION_HEADERS)
+        )
+
+
+class CSVQuestionReader:
+    """
+    The rows of a CSV upload, decoded as they are read.
+
+    The header is read and checked on construction, so a form can reject a
+    bad upload without reading its rows; the rows are decoded as they are
+    iterated and the file is never held in memory as a whole.
+    """
+
+    def __init__(self, uploaded_file):
+        uploaded_file.seek(0)
+        self._text = io.TextIOWrapper(uploaded_file, encoding='utf-8-sig', newline='')
+        self._reader = csv.reader(self._text)
+        try:
+            check_header(self._read_next())
+        except QuestionImportError:
+            self.close()
+            raise
+
+    def _read_next(self):
+        try:
+            return next(self._reader, None)
+        except UnicodeDecodeError as e:
+            raise QuestionImportError(f"File is not UTF-8 encoded. Please save your CSV as UTF-8. Error: {e}")
+
+    def __iter__(self):
+        """Yield (line_number, values) for every non-blank row"""
+        try:
+            while (values := self._read_next()) is not None:
+                if any(v.strip() for v in values):
+                    yield self._reader.line_num, values
+        finally:
+            self.close()
+
+    def close(self):
+        # Detach rather than close so the upload stays open for the caller
+        if self._text is not None:
+            self._text.detach()
+            self._text = None
+
+
+class XLSXQuestionReader:
+    """
+    The rows of the first sheet of an .xlsx upload.
+
+    The workbook is opened read-only, so openpyxl streams rows from the file
+    instead of loading the sheet, and memory use stays flat however many
+    rows it has. Like CSVQuestionReader, the header is checked on
+    construction.
+    """
+
+    def __init__(self, uploaded_file):
+        uploaded_file.seek(0)
+        try:
+            self._workbook = openpyxl.load_workbook(uploaded_file, read_only=True, data_only=True)
+        except (InvalidFileException, zipfile.BadZipFile, KeyError, OSError) as e:
+            raise QuestionImportError(f"File is not a valid Excel workbook. Error: {e}")
+        self._rows = self._workbook.active.iter_rows(values_only=True)
+        try:
+            header = next(self._rows, None)
+            check_header(None if header is None else [_cell(v) for v in header])
+        except QuestionImportError:
+            self.close()
+            raise
+
+    def __iter__(self):
+        """Yield (line_number, values) for every non-blank row"""
+        width = len(QUESTION_HEADERS)
+        try:
+            for line, values in enumerate(self._rows, start=2):
+                values = list(values[:width]) + [None] * (width - len(values))
+                if any(_cell(v) for v in values):
+                    yield line, values
+        finally:
+            self.close()
+
+    def close(self):
+        if self._workbook is not None:
+            self._workbook.close()
+            self._workbook = None
+
+
+READERS = {
+    '.csv': CSVQuestionReader,
+    '.xlsx': XLSXQuestionReader,
+}
+
+
+def open_question_file(uploaded_file):
+    """A row reader for a .csv or .xlsx upload, with its header already checked"""
+    extension = os.path.splitext(uploaded_file.name)[1].lower()
+    reader = READERS.get(extension)
+    if reader is None:
+        raise QuestionImportError('File must be a CSV (.csv) or Excel (.xlsx) file.')
+    return reader(uploaded_file)
+
+
+def _cell(value):
+    return '' if value is None else str(value).strip()
+
+
+def parse_row(values):
+    """
+    Validate one row and return (question fields, [answer fields]).
+
+    Raises ValueError with a message for the admin when the row is invalid.
+    """
+    values = list(values)
+    if len(values) != len(QUESTION_HEADERS):
+        raise ValueError(f"expected {len(QUESTION_HEADERS)} columns, found {len(values)}")
+    row = dict(zip(QUESTION_HEADERS, (_cell(v) for v in values)))
+
+    if not row['question_text']:
+        raise ValueError("question_text is required")
+    question_type = row['question_type'] or 'multiple_choice'
+    if question_type not in QUESTION_TYPES:
+        raise ValueError(f"unknown question_type '{question_type}'")
+
+    answers = []
+    for i in range(1, ANSWER_SLOTS + 1):
+        text = row[f'answer_{i}']
+        if not text:
+            continue
+        if len(text) > ANSWER_TEXT_MAX_LENGTH:
+            raise ValueError(f"answer_{i} is longer than {ANSWER_TEXT_MAX_LENGTH} characters")
+        answers.append({
+            'text': text,
+            'is_correct': row[f'answer_{i}_correct'].lower() in TRUE_VALUES,
+            'order': i,
+        })
+
+    correct = sum(1 for a in answers if a['is_correct'])
+    if correct == 0:
+        raise ValueError("at least one answer must be marked as correct")
+    if question_type == 'single_choice' and correct > 1:
+        raise ValueError("single choice questions can only have one correct answer")
+
+    return {'text_raw': row['question_text'], 'question_type': question_type}, answers
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def import_rows(video, rows, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Import (line_number, values) rows as questions of a video.
+
+    Nothing is saved when any row is invalid; the result then lists the
+    row errors. ``progress`` is called with the number of rows read after
+    every chunk.
+    """
+    result = ImportResult()
+    with transaction.atomic():
+        # A no-op UPDATE locks the video row, so imports into the same video
+        # take turns and their orders don't collide. On SQLite it also takes
+        # the write lock up front instead of partway through the import.
+        Video.objects.filter(pk=video.pk).update(order=F('order'))
+        next_order = (Question.objects.filter(video=video).aggregate(m=Max('order'))['m'] or 0) + 1
+
+        for chunk in _chunks(rows, chunk_size):
+            parsed = []
+            for line, values in chunk:
+                try:
+                    parsed.append(parse_row(values))
+                except ValueError as e:
+                    result.errors.append(RowError(line, str(e)))
+            result.rows += len(chunk)
+
+            if not result.errors:
+                questions = Question.objects.bulk_create([
+                    Question(video=video, order=next_order + index, **fields)
+                    for index, (fields, _) in enumerate(parsed)
+                ])
+                Answer.objects.bulk_create([
+                    Answer(question=question, **answer)
+                    for question, (_, answers) in zip(questions, parsed)
+                    for answer in answers
+                ])
+                next_order += len(questions)
+                result.created += len(questions)
+
+            if progress:
+                progress(result.rows)
+            if len(result.errors) >= MAX_ERRORS:
+                break
+
+        if result.errors:
+            transaction.set_rollback(True)
+            result.created = 0
+
+    if result.created:
+        invalidate_quiz_bundle(video.id)
+    return result
+
+
+def import_file(uploaded_file, video, **kwargs):
+    return import_rows(video, open_question_file(uploaded_file), **kwargs)
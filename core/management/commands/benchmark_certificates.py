@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.certificate_render import render_certificate, render_certificate_full, static_layer
+
+
+class Command(BaseCommand):
+    help = "Compare full certificate rendering with rendering over the pre-built static layer."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=1000, help='Certificates to render with each method.')
+
+    def handle(self, *args, **options):
+        count = options['count']
+        details = [
+            {
+                'name': f'Learner {i}',
+                'issue_date': '2025-01-01',
+                'video_count': 12,
+                'certificate_code': f'VQ-{i}-{i}',
+            }
+            for i in range(count)
+        ]
+        static_layer()  # built once per process; not part of the per-certificate cost
+
+        results = {}
+        for label, render in (('full', render_certificate_full), ('static layer', render_certificate)):
+            started = time.perf_counter()
+            total_bytes = sum(len(render(d)) for d in details)
+            elapsed = time.perf_counter() - started
+            results[label] = elapsed
+            self.stdout.write(
+                f"{label:>12}: {elapsed:.2f}s for {count} certificates, "
+                f"{elapsed / count * 1000:.2f} ms and {total_bytes // count} bytes each"
+            )
+
+        if results['static layer']:
+            self.stdout.write(self.style.SUCCESS(f"Speed-up: {results['full'] / results['static layer']:.2f}x"))
@@ -0,0 +1,67 @@
+import csv
+import io
+import time
+
+import openpyxl
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.importers import QUESTION_HEADERS, import_file, open_question_file, parse_row
+from core.models import Video
+
+
+def sample_rows(count):
+    for i in range(count):
+        row = [f'Sample question {i}?', 'multiple_choice']
+        for n in range(1, 5):
+            row += [f'Answer {n} to {i}', 'True' if n == 2 else 'False']
+        yield row
+
+
+def csv_upload(count):
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(QUESTION_HEADERS)
+    writer.writerows(sample_rows(count))
+    return SimpleUploadedFile('benchmark.csv', output.getvalue().encode('utf-8'))
+
+
+def xlsx_upload(count):
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(QUESTION_HEADERS)
+    for row in sample_rows(count):
+        sheet.append(row)
+    output = io.BytesIO()
+    workbook.save(output)
+    return SimpleUploadedFile('benchmark.xlsx', output.getvalue())
+
+
+class Command(BaseCommand):
+    help = "Compare CSV and XLSX question import throughput. Nothing is left in the database."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        count = options['rows']
+        for label, build in (('CSV', csv_upload), ('XLSX', xlsx_upload)):
+            upload = build(count)
+
+            started = time.perf_counter()
+            for _, values in open_question_file(upload):
+                parse_row(values)
+            parse_time = time.perf_counter() - started
+
+            with transaction.atomic():
+                video = Video.objects.create(title='Import benchmark', status='draft', is_active=False)
+                started = time.perf_counter()
+                result = import_file(upload, video)
+                import_time = time.perf_counter() - started
+                transaction.set_rollback(True)
+
+            self.stdout.write(
+                f"{label:>4}: {upload.size // 1024} KB, read+validate {count / parse_time:,.0f} rows/s, "
+                f"full import {result.created / import_time:,.0f} rows/s ({import_time:.2f}s)"
+            )
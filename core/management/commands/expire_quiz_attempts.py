@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from core.expiry import run_scheduler
+
+
+class Command(BaseCommand):
+    help = "Grade and close quiz attempts whose timer has run out. Use --loop to keep running as a worker."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep running and expire attempts as their deadlines pass.')
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument('--poll-interval', type=int, default=30, help='Seconds between scans for new attempts.')
+
+    def handle(self, *args, **options):
+        closed = run_scheduler(
+            batch_size=options['batch_size'],
+            poll_interval=options['poll_interval'],
+            once=not options['loop'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Closed {closed} expired attempts."))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from core.answer_buffer import flush_answers, write_behind_enabled
+from core.models import QuizAttempt
+
+
+class Command(BaseCommand):
+    help = "Flush write-behind answer buffers of open quiz attempts to the database. Run it from cron."
+
+    def handle(self, *args, **options):
+        if not write_behind_enabled():
+            self.stdout.write("QUIZ_ANSWER_WRITE_BEHIND is off; nothing to flush.")
+            return
+
+        attempts = 0
+        answers = 0
+        for attempt in QuizAttempt.objects.filter(status='in_progress').iterator():
+            flushed = flush_answers(attempt)
+            if flushed:
+                attempts += 1
+                answers += len(flushed)
+
+        self.stdout.write(self.style.SUCCESS(f"Flushed {answers} answers for {attempts} attempts."))
@@ -0,0 +1,64 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from core.certificate_jobs import render_context, render_workers
+from core.certificate_render import render_certificate
+from core.certificates import certificate_details, certificate_fingerprint, is_current, store_certificate_file
+from core.models import Certificate
+from core.outline import get_course_outline
+
+
+class Command(BaseCommand):
+    help = "Render certificates ahead of time for every user who has passed all videos but has no current PDF."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=render_workers(),
+            help='Render processes to use; 0 renders in this process.',
+        )
+
+    def handle(self, *args, **options):
+        video_ids = get_course_outline().video_ids
+        if not video_ids:
+            self.stdout.write("No published videos.")
+            return
+
+        eligible = list(
+            User.objects
+            .filter(videoprogress__video_id__in=video_ids, videoprogress__status='passed')
+            .annotate(passed=Count('videoprogress'))
+            .filter(passed=len(video_ids))
+        )
+        # Oldest first, so each user ends up with the newest one, as latest_certificate() picks
+        certificates = {
+            c.user_id: c for c in Certificate.objects.filter(user__in=eligible).order_by('issue_date', 'id')
+        }
+        missing = [Certificate(user=user) for user in eligible if user.id not in certificates]
+        for certificate in Certificate.objects.bulk_create(missing):
+            certificates[certificate.user_id] = certificate
+
+        jobs = []
+        for user in eligible:
+            certificate = certificates[user.id]
+            details = certificate_details(user, certificate)
+            fingerprint = certificate_fingerprint(details)
+            if not is_current(certificate, fingerprint):
+                jobs.append((certificate, fingerprint, details))
+
+        all_details = [details for _, _, details in jobs]
+        if jobs and options['workers']:
+            with ProcessPoolExecutor(max_workers=options['workers'], mp_context=render_context()) as pool:
+                self.store(jobs, pool.map(render_certificate, all_details, chunksize=16))
+        elif jobs:
+            self.store(jobs, map(render_certificate, all_details))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rendered {len(jobs)} certificates; {len(eligible) - len(jobs)} were already current."
+        ))
+
+    def store(self, jobs, rendered):
+        for (certificate, fingerprint, _), pdf in zip(jobs, rendered):
+            store_certificate_file(certificate, fingerprint, pdf)
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from core.import_jobs import run_queued_jobs
+
+
+class Command(BaseCommand):
+    help = "Run queued bulk question imports. Use --loop to keep running as a worker."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep running and pick up new jobs as they are queued.')
+        parser.add_argument('--poll-interval', type=int, default=5, help='Seconds between checks for new jobs.')
+
+    def handle(self, *args, **options):
+        processed = run_queued_jobs(poll_interval=options['poll_interval'], once=not options['loop'])
+        self.stdout.write(self.style.SUCCESS(f"Ran {processed} import jobs."))
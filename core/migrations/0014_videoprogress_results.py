@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 09:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_remove_question_explanation_remove_question_hint_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='videoprogress',
+            name='results',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
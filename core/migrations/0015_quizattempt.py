@@ -0,0 +1,85 @@
+# Generated by Django 5.2.3 on 2026-10-18 09:21
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+ATTEMPT_STATUSES = {'in_progress', 'passed', 'failed', 'timeout'}
+
+
+def copy_latest_attempts(apps, schema_editor):
+    """Turn the attempt stored in place on each progress row into a QuizAttempt"""
+    VideoProgress = apps.get_model('core', 'VideoProgress')
+    QuizAttempt = apps.get_model('core', 'QuizAttempt')
+    for progress in VideoProgress.objects.exclude(status='not_attempted').iterator():
+        if progress.status in ATTEMPT_STATUSES:
+            status = progress.status
+        else:
+            status = 'in_progress' if progress.ended_at is None else 'failed'
+        attempt = QuizAttempt.objects.create(
+            user_id=progress.user_id,
+            video_id=progress.video_id,
+            number=max(progress.attempts, 1),
+            status=status,
+            started_at=progress.started_at or progress.attempt_time,
+            ended_at=progress.ended_at,
+            score=progress.score,
+            percentage=progress.percentage,
+            answers=progress.answers,
+            results=progress.results,
+        )
+        VideoProgress.objects.filter(pk=progress.pk).update(current_attempt=attempt)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_videoprogress_results'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuizAttempt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField()),
+                ('status', models.CharField(choices=[('in_progress', 'In Progress'), ('passed', 'Passed'), ('failed', 'Failed'), ('timeout', 'Timeout')], default='in_progress', max_length=20)),
+                ('started_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('ended_at', models.DateTimeField(blank=True, null=True)),
+                ('score', models.FloatField(blank=True, null=True)),
+                ('percentage', models.FloatField(default=0.0)),
+                ('answers', models.JSONField(blank=True, default=dict)),
+                ('results', models.JSONField(blank=True, default=list)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quiz_attempts', to=settings.AUTH_USER_MODEL)),
+                ('video', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attempts', to='core.video')),
+            ],
+            options={
+                'ordering': ['-started_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='videoprogress',
+            name='current_attempt',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.quizattempt'),
+        ),
+        migrations.AddIndex(
+            model_name='quizattempt',
+            index=models.Index(fields=['user', 'video', 'started_at'], name='core_quizat_user_id_39b2e6_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='quizattempt',
+            constraint=models.UniqueConstraint(fields=('user', 'video', 'number'), name='unique_attempt_number'),
+        ),
+        migrations.RunPython(copy_latest_attempts, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='videoprogress',
+            name='answers',
+        ),
+        migrations.RemoveField(
+            model_name='videoprogress',
+            name='results',
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.3 on 2026-10-18 09:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def copy_answers_to_rows(apps, schema_editor):
+    """Move each attempt's {question_id: answer_id} JSON into AttemptAnswer rows"""
+    QuizAttempt = apps.get_model('core', 'QuizAttempt')
+    AttemptAnswer = apps.get_model('core', 'AttemptAnswer')
+    Answer = apps.get_model('core', 'Answer')
+    for attempt in QuizAttempt.objects.exclude(answers={}).iterator():
+        chosen = {}
+        for question_id, answer_id in attempt.answers.items():
+            try:
+                chosen[int(answer_id)] = int(question_id)
+            except (TypeError, ValueError):
+                continue
+        # Only keep answers that still exist and belong to the question they were given for
+        valid = Answer.objects.filter(id__in=chosen).values_list('id', 'question_id')
+        AttemptAnswer.objects.bulk_create([
+            AttemptAnswer(attempt_id=attempt.id, question_id=question_id, answer_id=answer_id)
+            for answer_id, question_id in valid
+            if chosen[answer_id] == question_id
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_quizattempt'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttemptAnswer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('answered_at', models.DateTimeField(auto_now=True)),
+                ('answer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.answer')),
+                ('attempt', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='responses', to='core.quizattempt')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.question')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('attempt', 'question'), name='unique_attempt_question')],
+            },
+        ),
+        migrations.RunPython(copy_answers_to_rows, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='quizattempt',
+            name='answers',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 09:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_attemptanswer'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certificate',
+            name='fingerprint',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 VIDEO_STATUS = (
@@ -104,7 +105,8 @@ class VideoProgress(models.Model):
     attempt_time = models.DateTimeField(auto_now_add=True)
     started_at = models.DateTimeField(null=True, blank=True)
     ended_at = models.DateTimeField(null=True, blank=True)
-    answers = models.JSONField(default=dict, blank=True)  # Store user's answers as a JSON object
+    # Latest QuizAttempt; the fields above and below summarise the attempt history
+    current_attempt = models.ForeignKey('QuizAttempt', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
     time_taken = models.PositiveIntegerField(default=0)  # Time taken in seconds
     completed = models.BooleanField(default=False)
     # New field for attempt tracking
@@ -118,10 +120,95 @@ class VideoProgress(models.Model):
     class Meta:
         unique_together = ['user', 'video']
 
+class QuizAttempt(models.Model):
+    """One row per quiz attempt; rows are appended, never reused"""
+    STATUS_CHOICES = [
+        ('in_progress', 'In Progress'),
+        ('passed',      'Passed'),
+        ('failed',      'Failed'),
+        ('timeout',     'Timeout'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='quiz_attempts')
+    video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name='attempts')
+    number = models.PositiveIntegerField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='in_progress')
+    started_at = models.DateTimeField(default=timezone.now)
+    ended_at = models.DateTimeField(null=True, blank=True)
+    score = models.FloatField(null=True, blank=True)
+    percentage = models.FloatField(default=0.0)
+    # Graded snapshot: [question_id, answer_id, correct_answer_id, is_correct] per question
+    results = models.JSONField(default=list, blank=True)
+
+    def __str__(self):
+        return f"{self.user.username} - {self.video.title} - attempt {self.number}"
+
+    class Meta:
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['user', 'video', 'started_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'video', 'number'], name='unique_attempt_number'),
+        ]
+
+class AttemptAnswer(models.Model):
+    """The answer chosen for one question of an attempt, upserted on every change"""
+    attempt = models.ForeignKey(QuizAttempt, on_delete=models.CASCADE, related_name='responses')
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='+')
+    answer = models.ForeignKey(Answer, on_delete=models.CASCADE, related_name='+')
+    answered_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Attempt {self.attempt_id} - Q{self.question_id} -> {self.answer_id}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['attempt', 'question'], name='unique_attempt_question'),
+        ]
+
 class Certificate(models.Model):  # Fixed capitalization
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     issue_date = models.DateTimeField(auto_now_add=True)
     file = models.FileField(upload_to='certificates/', null=True, blank=True)
+    # Hash of the text printed on the stored file (see core.certificates)
+    fingerprint = models.CharField(max_length=64, blank=True)
 
     def __str__(self):
-        return f"Certificate for {self.user.username} issued on {self.issue_date.strftime('%Y-%m-%d')}"
\ No newline at end of file
+        return f"Certificate for {self.user.username} issued on {self.issue_date.strftime('%Y-%m-%d')}"
+
+class ImportJob(models.Model):
+    """A bulk question upload, imported in the background (see core.import_jobs)"""
+    STATUS_CHOICES = [
+        ('queued',    'Queued'),
+        ('running',   'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed',    'Failed'),
+    ]
+
+    video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name='import_jobs')
+    file = models.FileField(upload_to='imports/')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    # Final counts; while running, rows read so far are kept in the cache
+    rows_processed = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    # "Row N: problem" for each rejected row
+    errors = models.JSONField(default=list, blank=True)
+    message = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Import into {self.video.title} ({self.get_status_display()})"
+
+    @property
+    def finished(self):
+        return self.status in ('succeeded', 'failed')
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
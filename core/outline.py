@@ -0,0 +1,77 @@
+"""
+Cached course outline: the ordered ids of the published videos.
+
+Used wherever a view needs "video X of Y" or the videos before a given one.
+Cached like the quiz bundles (a version token in the cache plus a
+per-process LRU) and invalidated from ``core.signals`` on Video save/delete;
+like them it needs a cache shared by all workers.
+"""
+import uuid
+from dataclasses import dataclass
+from functools import lru_cache
+
+from django.core.cache import cache
+
+from .models import Video
+
+OUTLINE_VERSION_KEY = 'course_outline_version'
+OUTLINE_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+@dataclass(frozen=True)
+class CourseOutline:
+    version: str
+    video_ids: tuple  # published, active videos in course order
+    orders: tuple  # Video.order for each entry of video_ids
+    positions: dict  # video_id -> 0-based index; treat as read-only
+
+    def __len__(self):
+        return len(self.video_ids)
+
+    def position(self, video_id):
+        """1-based position of a video in the course, or None if it is not published"""
+        index = self.positions.get(video_id)
+        return None if index is None else index + 1
+
+    def videos_before(self, video_id):
+        """Ids of the published videos that come before this one"""
+        index = self.positions.get(video_id)
+        return self.video_ids[:index] if index is not None else ()
+
+
+def get_outline_version():
+    version = cache.get(OUTLINE_VERSION_KEY)
+    if version is None:
+        cache.add(OUTLINE_VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(OUTLINE_VERSION_KEY)
+    return version
+
+
+def invalidate_course_outline():
+    cache.set(OUTLINE_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def build_course_outline(version):
+    rows = list(
+        Video.objects.filter(is_active=True, status='published').order_by('order').values_list('id', 'order')
+    )
+    return CourseOutline(
+        version=version,
+        video_ids=tuple(video_id for video_id, _ in rows),
+        orders=tuple(order for _, order in rows),
+        positions={video_id: index for index, (video_id, _) in enumerate(rows)},
+    )
+
+
+@lru_cache(maxsize=8)
+def _local_outline(version):
+    key = f'course_outline:{version}'
+    outline = cache.get(key)
+    if outline is None:
+        outline = build_course_outline(version)
+        cache.set(key, outline, OUTLINE_CACHE_TIMEOUT)
+    return outline
+
+
+def get_course_outline():
+    return _local_outline(get_outline_version())
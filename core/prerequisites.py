@@ -0,0 +1,32 @@
+"""
+Sequential unlock rules shared by the dashboard and the quiz pages.
+
+A published video is unlocked when every published video before it in the
+course outline has been passed. The dashboard works this out from the
+progress rows it already holds; single-video views ask the database with
+one COUNT over the preceding video ids from the cached outline.
+"""
+from .models import VideoProgress
+from .outline import get_course_outline
+
+
+def passed_watermark(video_ids, passed_video_ids):
+    """How many videos at the start of video_ids have all been passed"""
+    count = 0
+    for video_id in video_ids:
+        if video_id not in passed_video_ids:
+            break
+        count += 1
+    return count
+
+
+def prerequisites_met(user, video_id):
+    """True when the video is published and all published videos before it are passed"""
+    outline = get_course_outline()
+    if video_id not in outline.positions:
+        return False
+    before = outline.videos_before(video_id)
+    if not before:
+        return True
+    passed = VideoProgress.objects.filter(user=user, video_id__in=before, status='passed').count()
+    return passed == len(before)
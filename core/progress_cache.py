@@ -0,0 +1,84 @@
+"""
+Per-user progress snapshots.
+
+All of a user's VideoProgress rows, reduced to the summary fields the
+dashboard reads, are kept in the cache as one entry. Saves and deletes of
+VideoProgress drop the entry once their transaction commits (see
+``core.signals``); bulk updates that bypass signals call
+``invalidate_progress`` themselves. When the entry is missing, a single
+worker rebuilds it from one query while the others wait briefly for the
+result, so an expiry doesn't start a stampede.
+
+The snapshot is only used for display. Unlock checks and certificate
+eligibility read the database, so they never act on a stale entry; the
+cache must still be shared by all workers for invalidation to reach them.
+"""
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import VideoProgress
+
+ProgressEntry = namedtuple(
+    'ProgressEntry',
+    ['video_id', 'status', 'attempts', 'score', 'percentage', 'best_score', 'current_attempt_id'],
+)
+
+SNAPSHOT_TIMEOUT = getattr(settings, 'PROGRESS_SNAPSHOT_TIMEOUT', 60 * 10)
+REBUILD_LOCK_TIMEOUT = 10
+REBUILD_WAIT_STEPS = 10
+REBUILD_WAIT_SECONDS = 0.05
+
+
+def _snapshot_key(user_id):
+    return f'progress_snapshot:{user_id}'
+
+
+def _lock_key(user_id):
+    return f'progress_snapshot:{user_id}:rebuild'
+
+
+def _entry(progress):
+    return ProgressEntry(
+        video_id=progress.video_id,
+        status=progress.status,
+        attempts=progress.attempts,
+        score=progress.score,
+        percentage=progress.percentage,
+        best_score=progress.best_score,
+        current_attempt_id=progress.current_attempt_id,
+    )
+
+
+def _build_snapshot(user_id):
+    return {p.video_id: _entry(p) for p in VideoProgress.objects.filter(user_id=user_id)}
+
+
+def get_progress_snapshot(user_id):
+    """{video_id: ProgressEntry} for every progress row of a user"""
+    key = _snapshot_key(user_id)
+    snapshot = cache.get(key)
+    if snapshot is not None:
+        return snapshot
+
+    if cache.add(_lock_key(user_id), True, REBUILD_LOCK_TIMEOUT):
+        try:
+            snapshot = _build_snapshot(user_id)
+            cache.set(key, snapshot, SNAPSHOT_TIMEOUT)
+        finally:
+            cache.delete(_lock_key(user_id))
+        return snapshot
+
+    # Another request is rebuilding it; wait a little for its result
+    for _ in range(REBUILD_WAIT_STEPS):
+        time.sleep(REBUILD_WAIT_SECONDS)
+        snapshot = cache.get(key)
+        if snapshot is not None:
+            return snapshot
+    return _build_snapshot(user_id)
+
+
+def invalidate_progress(user_id):
+    cache.delete(_snapshot_key(user_id))
@@ -0,0 +1,173 @@
+"""
+Immutable per-video quiz bundles.
+
+A bundle holds everything the quiz endpoints need about a video's question
+set: the active questions in order, their answers and the correct-answer
+ids. Bundles are stored in Django's cache under a per-video version token
+and kept in a small per-process LRU in front of it, so during a quiz no
+endpoint has to read the question tables. Saving or deleting a Video,
+Question or Answer bumps the version (see ``core.signals``). The version
+tokens never expire, so the cache must be shared by all worker processes
+(see CACHES in settings.py).
+"""
+import uuid
+from dataclasses import dataclass
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Question
+
+BUNDLE_CACHE_TIMEOUT = getattr(settings, 'QUIZ_BUNDLE_CACHE_TIMEOUT', 60 * 60 * 24)
+
+
+@dataclass(frozen=True)
+class BundleAnswer:
+    id: int
+    question_id: int
+    text: str
+    is_correct: bool
+
+
+@dataclass(frozen=True)
+class BundleQuestion:
+    id: int
+    order: int
+    text_raw: str
+    question_type: str
+    answers: tuple
+    correct_answer_ids: frozenset
+
+    @property
+    def correct_answer(self):
+        return next((a for a in self.answers if a.is_correct), None)
+
+
+@dataclass(frozen=True)
+class QuizBundle:
+    video_id: int
+    version: str
+    questions: tuple
+    # Lookup tables built from ``questions``; treat as read-only.
+    questions_by_id: dict
+    positions: dict  # question_id -> index in ``questions``
+    answers_by_id: dict
+    correct_answer_ids: frozenset
+    # (question_id, answer_id) pairs that score a point
+    correct_pairs: frozenset
+
+    def __len__(self):
+        return len(self.questions)
+
+    def exists(self):
+        return bool(self.questions)
+
+    def question(self, question_id):
+        """The active question with this id, or None"""
+        try:
+            return self.questions_by_id.get(int(question_id))
+        except (TypeError, ValueError):
+            return None
+
+    def is_valid_answer(self, question_id, answer_id):
+        """True when answer_id is an answer of the active question question_id"""
+        question = self.question(question_id)
+        answer = self.answers_by_id.get(answer_id)
+        return question is not None and answer is not None and answer.question_id == question.id
+
+    def clamp_index(self, index):
+        return max(0, min(index, len(self.questions) - 1))
+
+    def navigation(self, index):
+        """(question, prev_index, next_index) for a 0-based position; IndexError when out of range"""
+        if not 0 <= index < len(self.questions):
+            raise IndexError(index)
+        prev_index = index - 1 if index > 0 else None
+        next_index = index + 1 if index < len(self.questions) - 1 else None
+        return self.questions[index], prev_index, next_index
+
+    def client_questions(self):
+        """Questions and answers for the browser, with correctness left out"""
+        return [
+            {
+                'id': q.id,
+                'text': q.text_raw,
+                'answers': [{'id': a.id, 'text': a.text} for a in q.answers],
+            }
+            for q in self.questions
+        ]
+
+
+def _version_key(video_id):
+    return f'quiz_bundle_version:{video_id}'
+
+
+def _bundle_key(video_id, version):
+    return f'quiz_bundle:{video_id}:{version}'
+
+
+def get_bundle_version(video_id):
+    key = _version_key(video_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_quiz_bundle(video_id):
+    """Give the video a new bundle version; old bundles simply age out"""
+    cache.set(_version_key(video_id), uuid.uuid4().hex, None)
+
+
+def build_quiz_bundle(video_id, version):
+    questions = []
+    answers_by_id = {}
+    queryset = (
+        Question.objects
+        .filter(video_id=video_id, is_active=True)
+        .order_by('order')
+        .prefetch_related('answers')
+    )
+    for question in queryset:
+        answers = tuple(
+            BundleAnswer(id=a.id, question_id=question.id, text=a.text, is_correct=a.is_correct)
+            for a in sorted(question.answers.all(), key=lambda a: a.order)
+        )
+        for answer in answers:
+            answers_by_id[answer.id] = answer
+        questions.append(BundleQuestion(
+            id=question.id,
+            order=question.order,
+            text_raw=question.text_raw,
+            question_type=question.question_type,
+            answers=answers,
+            correct_answer_ids=frozenset(a.id for a in answers if a.is_correct),
+        ))
+
+    return QuizBundle(
+        video_id=video_id,
+        version=version,
+        questions=tuple(questions),
+        questions_by_id={q.id: q for q in questions},
+        positions={q.id: index for index, q in enumerate(questions)},
+        answers_by_id=answers_by_id,
+        correct_answer_ids=frozenset().union(*(q.correct_answer_ids for q in questions)),
+        correct_pairs=frozenset((q.id, a) for q in questions for a in q.correct_answer_ids),
+    )
+
+
+@lru_cache(maxsize=getattr(settings, 'QUIZ_BUNDLE_LRU_SIZE', 256))
+def _local_bundle(video_id, version):
+    key = _bundle_key(video_id, version)
+    bundle = cache.get(key)
+    if bundle is None:
+        bundle = build_quiz_bundle(video_id, version)
+        cache.set(key, bundle, BUNDLE_CACHE_TIMEOUT)
+    return bundle
+
+
+def get_quiz_bundle(video_id):
+    """Return the current QuizBundle for a video"""
+    return _local_bundle(int(video_id), get_bundle_version(video_id))
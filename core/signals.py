@@ -0,0 +1,60 @@
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Answer, Question, Video, VideoProgress
+from .outline import invalidate_course_outline
+from .progress_cache import invalidate_progress
+from .quiz_bundle import invalidate_quiz_bundle
+
+
+def _now_and_on_commit(func):
+    # Bump now so this process stops serving the old entry, and again on
+    # commit so an entry rebuilt from pre-commit data elsewhere is dropped.
+    func()
+    transaction.on_commit(func)
+
+
+def _invalidate(video_id):
+    _now_and_on_commit(lambda: invalidate_quiz_bundle(video_id))
+
+
+@receiver([post_save, post_delete], sender=Video)
+def video_changed(sender, instance, **kwargs):
+    _invalidate(instance.pk)
+    _now_and_on_commit(invalidate_course_outline)
+
+
+@receiver([post_save, post_delete], sender=Question)
+def question_changed(sender, instance, **kwargs):
+    _invalidate(instance.video_id)
+
+
+def _answer_video_id(answer):
+    # The admin inline has the question loaded already
+    if Answer.question.is_cached(answer):
+        return answer.question.video_id
+    return Question.objects.filter(pk=answer.question_id).values_list('video_id', flat=True).first()
+
+
+@receiver(post_save, sender=Answer)
+def answer_saved(sender, instance, **kwargs):
+    _invalidate(_answer_video_id(instance))
+
+
+@receiver(post_delete, sender=Answer)
+def answer_deleted(sender, instance, origin=None, **kwargs):
+    # Deleting a question or a video cascades to its answers, and their own
+    # signals invalidate the bundle; skip a lookup per answer
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if model in (Question, Video):
+        return
+    _invalidate(_answer_video_id(instance))
+
+
+@receiver([post_save, post_delete], sender=VideoProgress)
+def progress_changed(sender, instance, **kwargs):
+    # Only once committed: a rolled-back save must not reach the snapshot
+    user_id = instance.user_id
+    transaction.on_commit(lambda: invalidate_progress(user_id))
@@ -0,0 +1,75 @@
+from django.db.models import Avg, Count, F, FilteredRelation, Q, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Video
+
+COMPLETED_STATUSES = ('passed', 'failed', 'timeout')
+
+
+def user_course_summary(user):
+    """
+    Course-wide statistics for a user, computed by one aggregate query.
+
+    Every published video is left-joined to the user's progress row for it,
+    so videos without a row count as not attempted and still contribute
+    their full ``max_attempts`` to the retries remaining.
+    """
+    totals = (
+        Video.objects
+        .filter(is_active=True, status='published')
+        .annotate(progress=FilteredRelation('videoprogress', condition=Q(videoprogress__user=user)))
+        .aggregate(
+            total_videos=Count('id'),
+            attempted_count=Count('progress'),
+            passed_count=Count('progress', filter=Q(progress__status='passed')),
+            failed_count=Count('progress', filter=Q(progress__status__in=['failed', 'timeout'])),
+            average_score=Avg('progress__percentage', filter=Q(progress__status__in=COMPLETED_STATUSES)),
+            total_retries_remaining=Sum(
+                Greatest(F('max_attempts') - Coalesce(F('progress__attempts'), Value(0)), Value(0))
+            ),
+        )
+    )
+
+    return _summary(
+        total_videos=totals['total_videos'],
+        attempted_count=totals['attempted_count'],
+        passed_count=totals['passed_count'],
+        failed_count=totals['failed_count'],
+        total_retries_remaining=totals['total_retries_remaining'] or 0,
+        average_score=totals['average_score'],
+    )
+
+
+def summarise_progress(videos, progress_by_video):
+    """
+    The same statistics as user_course_summary(), worked out from progress
+    rows the caller already holds, so a page showing both the rows and the
+    stats can't show two different states.
+    """
+    rows = [progress_by_video.get(video.id) for video in videos]
+    completed = [p.percentage for p in rows if p is not None and p.status in COMPLETED_STATUSES]
+    return _summary(
+        total_videos=len(videos),
+        attempted_count=sum(1 for p in rows if p is not None),
+        passed_count=sum(1 for p in rows if p is not None and p.status == 'passed'),
+        failed_count=sum(1 for p in rows if p is not None and p.status in ('failed', 'timeout')),
+        total_retries_remaining=sum(
+            max(video.max_attempts - (p.attempts if p is not None else 0), 0) for video, p in zip(videos, rows)
+        ),
+        average_score=sum(completed) / len(completed) if completed else None,
+    )
+
+
+def _summary(total_videos, attempted_count, passed_count, failed_count, total_retries_remaining, average_score):
+    completion_percentage = (passed_count / total_videos * 100) if total_videos > 0 else 0
+    return {
+        'total_videos': total_videos,
+        'passed_count': passed_count,
+        'failed_count': failed_count,
+        'not_attempted_count': total_videos - attempted_count,
+        'total_retries_remaining': total_retries_remaining,
+        'average_score': round(average_score or 0, 1),
+        'completion_percentage': round(completion_percentage, 1),
+        # Certificate eligibility: every published video has been passed
+        'all_passed': passed_count == total_videos,
+    }
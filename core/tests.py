@@ -1,3 +1,1125 @@
-from django.test import TestCase
+import asyncio
+import csv
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import zipfile
+import time
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import ExitStack, contextmanager
+from datetime import timedelta
+from unittest import addModuleCleanup, mock
+from urllib.parse import urlencode
 
-# Create your tests here.
+import openpyxl
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import signing
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import quote_etag
+
+from .certificate_render import render_certificate, static_layer
+from . import certificate_jobs, import_jobs, outline, quiz_bundle
+from .dashboard import build_dashboard
+from .expiry import RELOAD_INTERVAL, DeadlineHeap, expire_attempts, run_scheduler
+from .answer_buffer import buffered_answers, current_answers, flush_answers
+from .attempts import attempt_answers, record_answers, start_attempt
+from .checks import check_answer_buffer_cache
+from .models import Answer, AttemptAnswer, Certificate, ImportJob, Question, QuizAttempt, Video, VideoProgress
+from .outline import get_course_outline
+from .prerequisites import prerequisites_met
+from .progress_cache import get_progress_snapshot
+from .grading import grade_answers, record_grade
+from .forms import BulkQuestionImportForm
+from .import_jobs import job_state, recover_jobs, run_import_job, run_queued_jobs, sweep_jobs
+from .importers import QUESTION_HEADERS, QuestionImportError, import_file
+from .quiz_bundle import get_quiz_bundle, invalidate_quiz_bundle
+from .stats import summarise_progress, user_course_summary
+from .timer import TIMER_SALT
+from .timer_stream import timer_stream_app
+
+
+def setUpModule():
+    # A cache directory of this test process's own: the tests clear the cache
+    # all the time and must not touch the site's, or a parallel run's
+    location = tempfile.mkdtemp()
+    addModuleCleanup(shutil.rmtree, location, ignore_errors=True)
+    override = override_settings(CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location},
+    })
+    override.enable()
+    addModuleCleanup(override.disable)
+
+
+def make_video(order, **kwargs):
+    defaults = {
+        'title': f'Video {order}',
+        'description': '',
+        'video_file': f'videos/{order}.mp4',
+        'order': order,
+        'status': 'published',
+    }
+    defaults.update(kwargs)
+    return Video.objects.create(**defaults)
+
+
+def make_question(video, order, correct=2):
+    question = Question.objects.create(video=video, text_raw=f'Question {order}', order=order)
+    for i in range(1, 5):
+        Answer.objects.create(question=question, text=f'Answer {i}', is_correct=(i == correct), order=i)
+    return question
+
+
+@contextmanager
+def other_worker():
+    """Run the block as another worker process would: its own cache client and empty LRUs"""
+    quiz_bundle._local_bundle.cache_clear()
+    outline._local_outline.cache_clear()
+    fresh = caches.create_connection('default')
+    modules = ['answer_buffer', 'certificate_jobs', 'import_jobs', 'outline', 'progress_cache', 'quiz_bundle']
+    with ExitStack() as stack:
+        for module in modules:
+            stack.enter_context(mock.patch(f'core.{module}.cache', fresh))
+        yield
+    quiz_bundle._local_bundle.cache_clear()
+    outline._local_outline.cache_clear()
+
+
+class DashboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('learner', password='pass12345')
+
+    def make_course(self, size):
+        videos = [make_video(i) for i in range(1, size + 1)]
+        for video in videos[:size // 2]:
+            VideoProgress.objects.create(user=self.user, video=video, status='passed', attempts=1, percentage=80)
+        return videos
+
+    def test_query_count_is_constant(self):
+        self.make_course(3)
+        with self.assertNumQueries(2):
+            build_dashboard(self.user)
+
+        # The committed saves drop the snapshot, so the next page rebuilds it
+        with self.captureOnCommitCallbacks(execute=True):
+            self.make_course(30)
+        with self.assertNumQueries(2):
+            context = build_dashboard(self.user)
+        self.assertEqual(context['stats']['passed_count'], 16)
+        self.assertEqual(context['stats']['total_videos'], 33)
+        with self.assertNumQueries(1):
+            build_dashboard(self.user)
+
+    def test_stats_match_the_rows(self):
+        videos = self.make_course(4)
+        build_dashboard(self.user)
+        # A change the snapshot hasn't seen yet shows in neither the rows nor the stats
+        VideoProgress.objects.filter(user=self.user, video=videos[2]).delete()
+        VideoProgress.objects.create(user=self.user, video=videos[2], status='passed', attempts=1, percentage=70)
+
+        context = build_dashboard(self.user)
+        passed_rows = sum(1 for item in context['video_data'] if item['status'] == 'passed')
+        self.assertEqual(context['stats']['passed_count'], passed_rows)
+        # Given the same rows, it agrees with the aggregate query
+        rows = {p.video_id: p for p in VideoProgress.objects.filter(user=self.user)}
+        self.assertEqual(summarise_progress(videos, rows), user_course_summary(self.user))
+
+    def test_unlock_chain_and_stats(self):
+        first, second, third = self.make_course(3)[:3]
+        VideoProgress.objects.filter(user=self.user, video=first).update(status='passed')
+
+        context = build_dashboard(self.user)
+        statuses = [item['status'] for item in context['video_data']]
+        self.assertEqual(statuses, ['passed', 'not_attempted', 'locked'])
+        self.assertEqual(context['stats']['passed_count'], 1)
+        self.assertEqual(context['stats']['not_attempted_count'], 2)
+        self.assertEqual(context['stats']['average_score'], 80)
+        self.assertFalse(context['all_passed'])
+
+    def test_dashboard_view_renders(self):
+        self.make_course(4)
+        self.client.login(username='learner', password='pass12345')
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['video_data']), 4)
+
+
+class CourseSummaryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('learner', password='pass12345')
+        self.other = User.objects.create_user('other', password='pass12345')
+
+    def test_summary_in_one_query(self):
+        first = make_video(1, max_attempts=3)
+        second = make_video(2, max_attempts=2)
+        make_video(3, max_attempts=2)
+        make_video(4, status='draft')
+        VideoProgress.objects.create(user=self.user, video=first, status='passed', attempts=1, percentage=90)
+        VideoProgress.objects.create(user=self.user, video=second, status='failed', attempts=2, percentage=40)
+        VideoProgress.objects.create(user=self.other, video=second, status='passed', attempts=1, percentage=100)
+
+        with self.assertNumQueries(1):
+            summary = user_course_summary(self.user)
+
+        self.assertEqual(summary['total_videos'], 3)
+        self.assertEqual(summary['passed_count'], 1)
+        self.assertEqual(summary['failed_count'], 1)
+        self.assertEqual(summary['not_attempted_count'], 1)
+        self.assertEqual(summary['total_retries_remaining'], 2 + 0 + 2)
+        self.assertEqual(summary['average_score'], 65)
+        self.assertEqual(summary['completion_percentage'], 33.3)
+        self.assertFalse(summary['all_passed'])
+
+
+class QuizBundleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.video = make_video(1)
+        self.questions = [make_question(self.video, i) for i in range(1, 4)]
+
+    def test_bundle_is_served_from_cache(self):
+        with self.assertNumQueries(2):
+            bundle = get_quiz_bundle(self.video.id)
+        self.assertEqual([q.id for q in bundle.questions], [q.id for q in self.questions])
+        self.assertEqual(len(bundle.correct_answer_ids), 3)
+
+        with self.assertNumQueries(0):
+            self.assertIs(get_quiz_bundle(self.video.id), bundle)
+
+    def test_answer_change_invalidates_bundle(self):
+        bundle = get_quiz_bundle(self.video.id)
+        answer = Answer.objects.get(question=self.questions[0], order=1)
+        answer.is_correct = True
+        answer.save()
+
+        updated = get_quiz_bundle(self.video.id)
+        self.assertNotEqual(updated.version, bundle.version)
+        self.assertIn(answer.id, updated.correct_answer_ids)
+
+    def test_cascade_delete_does_not_look_up_each_answers_question(self):
+        get_quiz_bundle(self.video.id)
+        with CaptureQueriesContext(connection) as queries:
+            self.video.delete()
+        question_selects = [q for q in queries if q['sql'].startswith('SELECT') and 'FROM "core_question"' in q['sql']]
+        self.assertEqual(len(question_selects), 1)  # the collector's own
+
+    def test_answer_change_reaches_other_workers(self):
+        self.assertNotIsInstance(caches['default'], LocMemCache)
+        get_quiz_bundle(self.video.id)
+        answer = Answer.objects.get(question=self.questions[0], order=1)
+        answer.is_correct = True
+        answer.save()
+
+        with other_worker():
+            updated = quiz_bundle.get_quiz_bundle(self.video.id)
+        self.assertIn((self.questions[0].id, answer.id), updated.correct_pairs)
+
+    def test_navigation_and_answer_validation(self):
+        bundle = get_quiz_bundle(self.video.id)
+        self.assertEqual(bundle.navigation(0)[1:], (None, 1))
+        self.assertEqual(bundle.navigation(2)[1:], (1, None))
+        self.assertEqual(bundle.clamp_index(10), 2)
+        with self.assertRaises(IndexError):
+            bundle.navigation(-1)
+
+        first, second = self.questions[:2]
+        self.assertTrue(bundle.is_valid_answer(str(first.id), first.answers.first().id))
+        self.assertFalse(bundle.is_valid_answer(first.id, second.answers.first().id))
+        self.assertFalse(bundle.is_valid_answer('nope', first.answers.first().id))
+
+    def test_inactive_question_is_dropped(self):
+        get_quiz_bundle(self.video.id)
+        self.questions[1].is_active = False
+        self.questions[1].save()
+        self.assertEqual(len(get_quiz_bundle(self.video.id)), 2)
+
+
+class QuizFlowTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('learner', password='pass12345')
+        self.client.login(username='learner', password='pass12345')
+        self.video = make_video(1, quiz_timer_seconds=600)
+        self.questions = [make_question(self.video, i) for i in range(1, 4)]
+
+    def answer(self, question, order):
+        answer = Answer.objects.get(question=question, order=order)
+        return self.client.post(
+            reverse('save_answer', args=[self.video.id]),
+            data={'question_id': question.id, 'selected_answer': answer.id},
+            content_type='application/json',
+        )
+
+    def test_take_and_submit_quiz(self):
+        self.assertEqual(self.client.get(reverse('quiz', args=[self.video.id])).status_code, 200)
+        self.assertEqual(self.answer(self.questions[0], 2).json()['answered_count'], 1)
+        self.assertEqual(self.answer(self.questions[1], 2).json()['answered_count'], 2)
+        self.assertEqual(self.answer(self.questions[2], 1).json()['answered_count'], 3)
+
+        self.client.get(reverse('submit_quiz', args=[self.video.id]))
+        progress = VideoProgress.objects.get(user=self.user, video=self.video)
+        self.assertEqual(progress.score, 2)
+        self.assertEqual(progress.status, 'passed')
+
+        response = self.client.get(reverse('quiz_result', args=[self.video.id]))
+        self.assertEqual(response.context['score'], 2)
+        self.assertEqual([r['is_correct'] for r in response.context['results']], [True, True, False])
+
+    def test_result_page_renders_from_snapshot(self):
+        self.client.get(reverse('quiz', args=[self.video.id]))
+        for question in self.questions:
+            self.answer(question, 2)
+        self.client.get(reverse('submit_quiz', args=[self.video.id]))
+        progress = VideoProgress.objects.get(user=self.user, video=self.video)
+        self.assertEqual([row[3] for row in progress.current_attempt.results], [1, 1, 1])
+
+        # Later edits to the quiz do not change an attempt that was already graded
+        self.questions[2].is_active = False
+        self.questions[2].save()
+        response = self.client.get(reverse('quiz_result', args=[self.video.id]))
+        self.assertEqual(response.context['score'], 3)
+        self.assertEqual(len(response.context['results']), 3)
+
+    def test_retry_appends_an_attempt(self):
+        self.video.max_attempts = 3
+        self.video.save()
+        self.client.get(reverse('quiz', args=[self.video.id]))
+        self.answer(self.questions[0], 1)
+        self.client.get(reverse('submit_quiz', args=[self.video.id]))
+        self.client.get(reverse('retry_quiz', args=[self.video.id]))
+        self.client.get(reverse('quiz', args=[self.video.id]))
+
+        attempts = QuizAttempt.objects.filter(user=self.user, video=self.video).order_by('number')
+        self.assertEqual([(a.number, a.status) for a in attempts], [(1, 'failed'), (2, 'in_progress')])
+        self.assertEqual(attempt_answers(attempts[0]), {self.questions[0].id: self.questions[0].answers.get(order=1).id})
+        self.assertEqual(attempt_answers(attempts[1]), {})
+
+        progress = VideoProgress.objects.get(user=self.user, video=self.video)
+        self.assertEqual(progress.attempts, 2)
+        self.assertEqual(progress.current_attempt, attempts[1])
+
+    def test_second_start_reuses_the_attempt_the_first_opened(self):
+        progress = VideoProgress.objects.create(user=self.user, video=self.video)
+        first = VideoProgress.objects.get(pk=progress.pk)
+        second = VideoProgress.objects.get(pk=progress.pk)
+
+        attempt = start_attempt(first, self.video)
+        self.assertEqual(start_attempt(second, self.video), attempt)
+        self.assertEqual((second.attempts, second.status), (1, 'in_progress'))
+        self.assertEqual(QuizAttempt.objects.filter(user=self.user, video=self.video).count(), 1)
+
+    def test_changing_an_answer_updates_its_row(self):
+        self.client.get(reverse('quiz', args=[self.video.id]))
+        self.answer(self.questions[0], 1)
+        self.answer(self.questions[1], 1)
+        self.assertEqual(self.answer(self.questions[0], 3).json()['answered_count'], 2)
+
+        attempt = VideoProgress.objects.get(user=self.user, video=self.video).current_attempt
+        answers = current_answers(attempt)
+        self.assertEqual(len(answers), 2)
+        self.assertEqual(answers[self.questions[0].id], self.questions[0].answers.get(order=3).id)
+
+    def test_answered_count_follows_bundle(self):
+        self.client.get(reverse('quiz', args=[self.video.id]))
+        self.answer(self.questions[0], 1)
+        self.answer(self.questions[1], 1)
+
+        url = reverse('get_question_data', args=[self.video.id])
+        self.assertEqual(self.client.get(url, {'q_index': 0}).json()['answered_count'], 2)
+
+        # Deactivating an answered question drops it from the count
+        self.questions[1].is_active = False
+        self.questions[1].save()
+        self.assertEqual(self.client.get(url, {'q_index': 0}).json()['answered_count'], 1)
+        self.assertEqual(self.answer(self.questions[2], 1).json()['answered_count'], 2)
+
+    def test_answer_click_keeps_count_without_rereading_answers(self):
+        self.client.get(reverse('quiz', args=[self.video.id]))
+        self.answer(self.questions[0], 2)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.answer(self.questions[1], 2).json()['answered_count'], 2)
+            self.assertEqual(self.answer(self.questions[1], 3).json()['answered_count'], 2)
+        self.assertFalse([q for q in queries if q['sql'].startswith('SELECT') and 'core_attemptanswer' in q['sql']])
+
+        # A new bundle version starts a counter rebuilt from the stored answers
+        invalidate_quiz_bundle(self.video.id)
+        self.assertEqual(self.answer(self.questions[2], 1).json()['answered_count'], 3)
+        self.assertEqual(self.answer(self.questions[0], 1).json()['answered_count'], 3)
+
+    def test_answered_count_is_the_same_on_every_worker(self):
+        self.client.get(reverse('quiz', args=[self.video.id]))
+        with other_worker():
+            self.answer(self.questions[0], 1)
+        self.answer(self.questions[1], 1)
+        with other_worker():
+            self.assertEqual(self.answer(self.questions[2], 1).json()['answered_count'], 3)
+
+    def test_sync_timer_from_token_needs_no_queries(self):
+        response = self.client.get(reverse('quiz', args=[self.video.id]))
+        token = response.context['timer_token']
+        self.client.logout()
+
+        url = reverse('sync_timer', args=[self.video.id])
+        with self.assertNumQueries(0):
+            remaining = self.client.get(url, {'token': token}).json()['remaining']
+        self.assertTrue(595 <= remaining <= 600)
+
+        self.assertEqual(self.client.get(url, {'token': token + 'x'}).status_code, 400)
+        other = make_video(2)
+        self.assertEqual(self.client.get(reverse('sync_timer', args=[other.id]), {'token': token}).status_code, 400)
+
+    def test_question_lookup_cost_does_not_depend_on_position(self):
+        self.client.get(reverse('quiz', args=[self.video.id]))
+        url = reverse('get_question_data', args=[self.video.id])
+        self.client.get(url, {'q_index': 1})
+        with CaptureQueriesContext(connection) as first:
+            self.client.get(url, {'q_index': 0})
+        with CaptureQueriesContext(connection) as last:
+            self.assertEqual(self.client.get(url, {'q_index': 2}).json()['next_index'], None)
+        self.assertEqual(len(first), len(last))
+        self.assertEqual(self.client.get(url, {'q_index': 3}).status_code, 400)
+
+    def test_quiz_payload_and_etag(self):
+        self.client.get(reverse('quiz', args=[self.video.id]))
+        self.answer(self.questions[0], 3)
+
+        url = reverse('quiz_payload', args=[self.video.id])
+        response = self.client.get(url)
+        payload = response.json()
+        self.assertEqual([q['id'] for q in payload['questions']], [q.id for q in self.questions])
+        self.assertNotIn('is_correct', payload['questions'][0]['answers'][0])
+        self.assertEqual(payload['selections'], {str(self.questions[0].id): self.questions[0].answers.get(order=3).id})
+
+        etag = response['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.answer(self.questions[1], 1)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_rejects_answer_from_other_question(self):
+        self.client.get(reverse('quiz', args=[self.video.id]))
+        other = Answer.objects.get(question=self.questions[1], order=1)
+        response = self.client.post(
+            reverse('save_answer', args=[self.video.id]),
+            data={'question_id': self.questions[0].id, 'selected_answer': other.id},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class GradingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('learner', password='pass12345')
+        self.client.login(username='learner', password='pass12345')
+
+    def make_quiz(self, size):
+        video = make_video(1, quiz_timer_seconds=600)
+        questions = Question.objects.bulk_create(
+            Question(video=video, text_raw=f'Question {i}', order=i) for i in range(1, size + 1)
+        )
+        Answer.objects.bulk_create(
+            Answer(question=q, text=f'Answer {i}', is_correct=(i == 1), order=i)
+            for q in questions for i in range(1, 5)
+        )
+        invalidate_quiz_bundle(video.id)
+        return video
+
+    def test_grade_answers(self):
+        video = self.make_quiz(3)
+        bundle = get_quiz_bundle(video.id)
+        first, second, third = bundle.questions
+        answers = {
+            str(first.id): first.answers[0].id,
+            str(second.id): second.answers[1].id,
+            # An answer from another question never scores
+            str(third.id): first.answers[0].id,
+        }
+        grade = grade_answers(bundle, answers)
+        self.assertEqual(grade.correct_count, 1)
+        self.assertEqual(grade.total, 3)
+        self.assertEqual([r.is_correct for r in grade.results], [True, False, False])
+
+    def submit_queries(self, size):
+        video = self.make_quiz(size)
+        bundle = get_quiz_bundle(video.id)
+        attempt = QuizAttempt.objects.create(user=self.user, video=video, number=1)
+        AttemptAnswer.objects.bulk_create(
+            AttemptAnswer(attempt=attempt, question_id=q.id, answer_id=q.answers[0].id) for q in bundle.questions
+        )
+        VideoProgress.objects.create(
+            user=self.user, video=video, status='in_progress', attempts=1, current_attempt=attempt,
+        )
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('submit_quiz', args=[video.id]))
+        self.assertEqual(VideoProgress.objects.get(user=self.user, video=video).score, size)
+        return len(queries)
+
+    def test_grading_cost_is_flat(self):
+        small = self.submit_queries(10)
+        large = self.submit_queries(500)
+        self.assertEqual(small, large)
+
+
+@override_settings(QUIZ_ANSWER_WRITE_BEHIND=True, QUIZ_ANSWER_FLUSH_INTERVAL=60)
+class WriteBehindTests(QuizFlowTests):
+    def test_answers_are_buffered_and_flushed_before_grading(self):
+        self.client.get(reverse('quiz', args=[self.video.id]))
+        for question in self.questions:
+            self.answer(question, 2)
+
+        # The first click opens a flush window; the rest wait in the cache
+        attempt = VideoProgress.objects.get(user=self.user, video=self.video).current_attempt
+        self.assertEqual(attempt.responses.count(), 1)
+
+        self.client.get(reverse('submit_quiz', args=[self.video.id]))
+        attempt.refresh_from_db()
+        self.assertEqual(attempt.responses.count(), 3)
+        self.assertEqual(attempt.score, 3)
+
+    def test_each_flush_writes_only_new_answers(self):
+        self.client.get(reverse('quiz', args=[self.video.id]))
+        attempt = VideoProgress.objects.get(user=self.user, video=self.video).current_attempt
+        with self.captureOnCommitCallbacks(execute=True):
+            self.answer(self.questions[0], 2)
+        self.assertEqual(buffered_answers(attempt), {})
+
+        self.answer(self.questions[1], 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(list(flush_answers(attempt)), [self.questions[1].id])
+        self.assertEqual(buffered_answers(attempt), {})
+        self.assertEqual(len(current_answers(attempt)), 2)
+
+    def test_click_during_a_flush_is_kept(self):
+        self.client.get(reverse('quiz', args=[self.video.id]))
+        self.answer(self.questions[0], 2)
+        self.answer(self.questions[1], 2)
+        attempt = VideoProgress.objects.get(user=self.user, video=self.video).current_attempt
+        newer = self.questions[1].answers.get(order=3).id
+
+        def clicked_meanwhile(attempt, answers):
+            record_answers(attempt, answers)
+            cache.set(f'answer_buffer:{attempt.id}:{self.questions[1].id}', newer)
+
+        with mock.patch('core.answer_buffer.record_answers', side_effect=clicked_meanwhile):
+            with self.captureOnCommitCallbacks(execute=True):
+                flush_answers(attempt)
+        self.assertEqual(buffered_answers(attempt), {self.questions[1].id: newer})
+        self.assertEqual(current_answers(attempt)[self.questions[1].id], newer)
+
+    def test_write_behind_needs_a_redis_cache(self):
+        self.assertEqual([error.id for error in check_answer_buffer_cache(None)], ['core.E001'])
+        redis = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://localhost'}}
+        with override_settings(CACHES=redis):
+            self.assertEqual(check_answer_buffer_cache(None), [])
+
+
+class TimerStreamTests(TestCase):
+    def run_stream(self, path, token):
+        sent = []
+
+        async def receive():
+            await asyncio.Event().wait()
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {'type': 'http', 'path': path, 'query_string': urlencode({'token': token}).encode()}
+        async_to_sync(timer_stream_app)(scope, receive, send)
+        return sent
+
+    def test_expired_deadline_sends_auto_submit_event(self):
+        token = signing.dumps({'v': 7, 'a': 1, 'd': time.time() - 5}, salt=TIMER_SALT)
+        sent = self.run_stream('/quiz/7/timer-stream/', token)
+
+        self.assertEqual(sent[0]['status'], 200)
+        body = b''.join(m.get('body', b'') for m in sent[1:]).decode()
+        self.assertIn('event: tick\ndata: {"remaining": 0}', body)
+        self.assertIn('event: expired\ndata: {"auto_submit_url": "/quiz/7/auto-submit/"}', body)
+        self.assertFalse(sent[-1].get('more_body', False))
+
+    def test_rejects_token_for_other_video(self):
+        token = signing.dumps({'v': 7, 'a': 1, 'd': time.time() + 60}, salt=TIMER_SALT)
+        self.assertEqual(self.run_stream('/quiz/8/timer-stream/', token)[0]['status'], 400)
+
+
+class ExpiryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.video = make_video(1, quiz_timer_seconds=60)
+        self.questions = [make_question(self.video, i) for i in range(1, 3)]
+
+    def start(self, username, minutes_ago, **fields):
+        user = User.objects.create_user(username)
+        started = timezone.now() - timedelta(minutes=minutes_ago)
+        attempt = QuizAttempt.objects.create(user=user, video=self.video, number=1, started_at=started, **fields)
+        VideoProgress.objects.create(
+            user=user, video=self.video, status='in_progress', attempts=1, started_at=started, current_attempt=attempt,
+        )
+        return attempt
+
+    def test_expired_attempts_are_graded_and_closed(self):
+        expired = self.start('gone', minutes_ago=10)
+        AttemptAnswer.objects.create(attempt=expired, question=self.questions[0], answer=self.questions[0].answers.get(order=2))
+        running = self.start('here', minutes_ago=0)
+
+        self.assertEqual(run_scheduler(once=True), 1)
+
+        expired.refresh_from_db()
+        self.assertEqual((expired.status, expired.score, expired.percentage), ('timeout', 1, 50))
+        progress = VideoProgress.objects.get(current_attempt=expired)
+        self.assertEqual((progress.status, progress.best_score), ('timeout', 50))
+        running.refresh_from_db()
+        self.assertEqual(running.status, 'in_progress')
+
+    def test_attempt_committed_out_of_id_order_is_found_on_reload(self):
+        heap = DeadlineHeap()
+        self.start('later', minutes_ago=0, id=1000)
+        heap.load_new()
+        # An insert with a lower id that only became visible after `later` was loaded
+        self.start('late', minutes_ago=10, id=999)
+
+        self.assertEqual(run_scheduler(once=True, heap=heap), 0)
+        heap._reloaded_at -= RELOAD_INTERVAL
+        self.assertEqual(run_scheduler(once=True, heap=heap), 1)
+        self.assertEqual(len(heap), 1)  # `later` was not pushed twice
+
+    def test_attempt_closed_by_a_submit_meanwhile_is_left_alone(self):
+        attempt = self.start('racing', minutes_ago=10)
+
+        def submitted_meanwhile(attempt):
+            QuizAttempt.objects.filter(pk=attempt.pk).update(status='passed', score=2)
+            VideoProgress.objects.filter(current_attempt=attempt).update(status='passed', best_score=100)
+
+        with mock.patch('core.expiry.flush_answers', side_effect=submitted_meanwhile):
+            self.assertEqual(expire_attempts([attempt.id]), 0)
+        attempt.refresh_from_db()
+        self.assertEqual((attempt.status, attempt.score), ('passed', 2))
+        progress = VideoProgress.objects.get(current_attempt=attempt)
+        self.assertEqual((progress.status, progress.best_score), ('passed', 100))
+
+    def test_only_one_grader_records_an_attempt(self):
+        attempt = self.start('twice', minutes_ago=0)
+        bundle = get_quiz_bundle(self.video.id)
+        first = VideoProgress.objects.select_related('current_attempt').get(current_attempt=attempt)
+        second = VideoProgress.objects.select_related('current_attempt').get(current_attempt=attempt)
+
+        self.assertTrue(record_grade(first, self.video, grade_answers(bundle, {})))
+        self.assertFalse(record_grade(second, self.video, grade_answers(bundle, {}), status='timeout'))
+        attempt.refresh_from_db()
+        self.assertEqual(attempt.status, 'failed')
+        self.assertEqual(VideoProgress.objects.get(current_attempt=attempt).status, 'failed')
+
+
+class CourseOutlineTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.videos = [make_video(i) for i in range(1, 4)]
+
+    def test_positions_are_cached_and_follow_video_changes(self):
+        outline = get_course_outline()
+        with self.assertNumQueries(0):
+            self.assertIs(get_course_outline(), outline)
+        self.assertEqual(outline.position(self.videos[2].id), 3)
+        self.assertEqual(outline.videos_before(self.videos[2].id), (self.videos[0].id, self.videos[1].id))
+
+        self.videos[0].status = 'draft'
+        self.videos[0].save()
+        outline = get_course_outline()
+        self.assertEqual(len(outline), 2)
+        self.assertIsNone(outline.position(self.videos[0].id))
+        self.assertEqual(outline.position(self.videos[2].id), 2)
+
+
+class PrerequisiteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('learner', password='pass12345')
+        self.videos = [make_video(i) for i in range(1, 6)]
+
+    def test_checks_read_the_database_in_one_query(self):
+        for video in self.videos[:3]:
+            VideoProgress.objects.create(user=self.user, video=video, status='passed', attempts=1)
+        get_course_outline()
+
+        with self.assertNumQueries(1):
+            self.assertTrue(prerequisites_met(self.user, self.videos[3].id))
+        with self.assertNumQueries(1):
+            self.assertFalse(prerequisites_met(self.user, self.videos[4].id))
+        with self.assertNumQueries(0):
+            self.assertTrue(prerequisites_met(self.user, self.videos[0].id))
+
+    def test_quiz_view_refuses_locked_video(self):
+        self.client.login(username='learner', password='pass12345')
+        response = self.client.get(reverse('quiz', args=[self.videos[1].id]))
+        self.assertRedirects(response, reverse('dashboard'))
+        self.assertFalse(QuizAttempt.objects.exists())
+
+
+class ProgressSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('learner', password='pass12345')
+        self.videos = [make_video(i) for i in range(1, 3)]
+
+    def test_committed_changes_drop_the_snapshot(self):
+        self.assertEqual(get_progress_snapshot(self.user.id), {})
+        with self.captureOnCommitCallbacks(execute=True):
+            progress = VideoProgress.objects.create(user=self.user, video=self.videos[0], status='passed', attempts=1)
+            VideoProgress.objects.create(user=self.user, video=self.videos[1], status='failed', attempts=3)
+
+        snapshot = get_progress_snapshot(self.user.id)
+        self.assertEqual(snapshot[self.videos[0].id].status, 'passed')
+        self.assertEqual(snapshot[self.videos[1].id].attempts, 3)
+        with self.assertNumQueries(0):
+            get_progress_snapshot(self.user.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            progress.delete()
+        self.assertNotIn(self.videos[0].id, get_progress_snapshot(self.user.id))
+
+    def test_rolled_back_saves_leave_the_snapshot_alone(self):
+        get_progress_snapshot(self.user.id)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                VideoProgress.objects.create(user=self.user, video=self.videos[0], status='passed', attempts=1)
+                raise RuntimeError
+        self.assertEqual(callbacks, [])
+        self.assertEqual(get_progress_snapshot(self.user.id), {})
+
+    def test_invalidation_reaches_other_workers(self):
+        self.assertEqual(get_progress_snapshot(self.user.id), {})
+        with other_worker(), self.captureOnCommitCallbacks(execute=True):
+            VideoProgress.objects.create(user=self.user, video=self.videos[0], status='passed', attempts=1)
+        self.assertEqual(get_progress_snapshot(self.user.id)[self.videos[0].id].status, 'passed')
+
+    def test_waits_for_a_concurrent_rebuild(self):
+        VideoProgress.objects.create(user=self.user, video=self.videos[0], status='passed', attempts=1)
+        cache.clear()
+        cache.add('progress_snapshot:%s:rebuild' % self.user.id, True)
+
+        def rebuilt_elsewhere(seconds):
+            cache.set('progress_snapshot:%s' % self.user.id, {})
+
+        with mock.patch('core.progress_cache.time.sleep', side_effect=rebuilt_elsewhere):
+            with self.assertNumQueries(0):
+                self.assertEqual(get_progress_snapshot(self.user.id), {})
+
+
+class CertificateTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root, CERTIFICATE_RENDER_WORKERS=0)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user('learner', password='pass12345', first_name='Ada')
+        for order in (1, 2):
+            VideoProgress.objects.create(user=self.user, video=make_video(order), status='passed', attempts=1)
+        self.client.login(username='learner', password='pass12345')
+
+    def download(self, **headers):
+        response = self.client.get(reverse('certificate'), headers=headers)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+    def test_pdf_is_stored_once_and_streamed_afterwards(self):
+        response, body = self.download()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(body.startswith(b'%PDF'))
+        certificate = Certificate.objects.get(user=self.user)
+        self.assertTrue(certificate.file)
+
+        with mock.patch('core.certificates.render_certificate') as render:
+            again, again_body = self.download()
+            render.assert_not_called()
+        self.assertEqual(again_body, body)
+
+        not_modified, _ = self.download(if_none_match=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+        partial, partial_body = self.download(range='bytes=0-3')
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(partial_body, b'%PDF')
+        self.assertEqual(partial['Content-Range'], f'bytes 0-3/{len(body)}')
+
+    def test_name_change_renders_a_new_file(self):
+        first, _ = self.download()
+        self.user.first_name = 'Grace'
+        self.user.save()
+        second, _ = self.download()
+        self.assertNotEqual(first['ETag'], second['ETag'])
+        self.assertEqual(len(os.listdir(os.path.join(settings.MEDIA_ROOT, 'certificates'))), 1)
+
+    @override_settings(CERTIFICATE_RENDER_WORKERS=2)
+    def test_background_render_returns_a_status_page(self):
+        pool = InlinePool()
+        with mock.patch('core.certificate_jobs.get_pool', return_value=pool):
+            response = self.client.get(reverse('certificate'))
+        self.assertEqual(response.status_code, 202)
+        self.assertContains(response, reverse('certificate_status'), status_code=202)
+        self.assertEqual(self.client.get(reverse('certificate_status')).json()['status'], 'pending')
+
+        pool.run()
+        self.assertEqual(self.client.get(reverse('certificate_status')).json()['status'], 'ready')
+        response, body = self.download()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(body.startswith(b'%PDF'))
+
+    @override_settings(CERTIFICATE_RENDER_WORKERS=2)
+    def test_broken_pool_is_replaced(self):
+        broken = mock.Mock()
+        broken.submit.side_effect = BrokenProcessPool
+        fresh = InlinePool()
+        self.addCleanup(setattr, certificate_jobs, '_pool', None)
+        certificate_jobs._pool = broken
+        with mock.patch('core.certificate_jobs.ProcessPoolExecutor', return_value=fresh):
+            self.assertEqual(self.client.get(reverse('certificate')).status_code, 202)
+        self.assertIs(certificate_jobs._pool, fresh)
+        fresh.run()
+        self.assertEqual(self.client.get(reverse('certificate_status')).json()['status'], 'ready')
+
+    @override_settings(CERTIFICATE_RENDER_WORKERS=2)
+    def test_render_lost_with_its_pool_is_not_left_pending(self):
+        pool = InlinePool()
+        self.addCleanup(setattr, certificate_jobs, '_pool', None)
+        certificate_jobs._pool = pool
+        self.client.get(reverse('certificate'))
+        with self.assertLogs('core.certificate_jobs', 'ERROR'):
+            pool.jobs[0][0].set_exception(BrokenProcessPool())
+        self.assertIsNone(certificate_jobs._pool)
+        self.assertEqual(self.client.get(reverse('certificate_status')).json()['status'], 'missing')
+
+    @override_settings(CERTIFICATE_RENDER_WORKERS=2)
+    def test_lost_job_is_not_reported_ready(self):
+        with mock.patch('core.certificate_jobs.get_pool', return_value=InlinePool()):
+            self.client.get(reverse('certificate'))
+        # Another worker, or the same one after the job key expired, sees no job and no file
+        cache.clear()
+        self.assertEqual(self.client.get(reverse('certificate_status')).json()['status'], 'missing')
+
+    def test_render_module_does_not_load_django(self):
+        script = 'import sys, core.certificate_render; print(any(m.startswith("django") for m in sys.modules))'
+        output = subprocess.run([sys.executable, '-c', script], cwd=settings.BASE_DIR, capture_output=True, text=True)
+        self.assertEqual(output.stdout.strip(), 'False', output.stderr)
+
+    def test_prerender_command_renders_eligible_users(self):
+        User.objects.create_user('starter', password='pass12345')
+        out = io.StringIO()
+        call_command('prerender_certificates', workers=0, stdout=out)
+        self.assertIn('Rendered 1 certificates', out.getvalue())
+        self.assertTrue(Certificate.objects.get(user=self.user).file)
+
+        call_command('prerender_certificates', workers=0, stdout=out)
+        self.assertIn('Rendered 0 certificates; 1 were already current', out.getvalue())
+
+    def test_prerender_and_download_use_the_newest_certificate(self):
+        older = Certificate.objects.create(user=self.user)
+        Certificate.objects.filter(pk=older.pk).update(issue_date=timezone.now() - timedelta(days=30))
+        newer = Certificate.objects.create(user=self.user)
+
+        call_command('prerender_certificates', workers=0, stdout=io.StringIO())
+        older.refresh_from_db()
+        newer.refresh_from_db()
+        self.assertFalse(older.file)
+        self.assertTrue(newer.file)
+
+        with mock.patch('core.certificates.render_certificate') as render:
+            response, _ = self.download()
+            render.assert_not_called()
+        self.assertEqual(response['ETag'], quote_etag(newer.fingerprint))
+
+
+    def test_static_layer_holds_only_the_shared_artwork(self):
+        layer = static_layer()
+        self.assertIn('(Certificate of Achievement)', layer)
+        self.assertIn('(Video Quiz Administrator)', layer)
+        self.assertNotIn('Certificate ID', layer)
+
+        details = {'name': 'Ada', 'issue_date': '2025-01-01', 'video_count': 2, 'certificate_code': 'VQ-1-1'}
+        self.assertTrue(render_certificate(details).startswith(b'%PDF'))
+        out = io.StringIO()
+        call_command('benchmark_certificates', count=5, stdout=out)
+        self.assertIn('Speed-up', out.getvalue())
+
+
+class InlinePool:
+    """Stands in for the render pool; queued jobs run when run() is called"""
+
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, fn, *args):
+        future = Future()
+        self.jobs.append((future, fn, args))
+        return future
+
+    def run(self):
+        for future, fn, args in self.jobs:
+            future.set_result(fn(*args))
+
+
+def question_csv(rows, header=None):
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(header or QUESTION_HEADERS)
+    writer.writerows(rows)
+    return SimpleUploadedFile('questions.csv', output.getvalue().encode('utf-8'), content_type='text/csv')
+
+
+def question_row(text, correct=2, question_type='multiple_choice'):
+    row = [text, question_type]
+    for i in range(1, 5):
+        row += [f'{text} answer {i}', 'True' if i == correct else 'False']
+    return row
+
+
+class QuestionImportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.video = make_video(1)
+        make_question(self.video, 7)
+
+    def test_rows_are_written_in_bulk(self):
+        upload = question_csv([question_row(f'Q{i}') for i in range(40)])
+        with self.assertNumQueries(6):  # savepoint, lock, max(order), 2 inserts, release
+            import_file(upload, self.video, chunk_size=50)
+
+        upload = question_csv([question_row(f'R{i}') for i in range(400)])
+        with CaptureQueriesContext(connection) as queries:
+            result = import_file(upload, self.video)
+        self.assertEqual(result.created, 400)
+        # SQLite's parameter limit splits the inserts into batches, but far below a statement per row
+        self.assertLess(len(queries), 20)
+
+        orders = list(Question.objects.filter(video=self.video).values_list('order', flat=True))
+        self.assertEqual(orders, list(range(7, 448)))
+        self.assertEqual(Answer.objects.filter(question__video=self.video, is_correct=True).count(), 441)
+        self.assertEqual(len(get_quiz_bundle(self.video.id)), 441)
+
+    def test_bad_rows_roll_back_the_whole_import(self):
+        progress = []
+        upload = question_csv([
+            question_row('fine'),
+            question_row('', correct=1),
+            question_row('no correct', correct=9),
+            question_row('odd type', question_type='essay'),
+        ])
+        result = import_file(upload, self.video, chunk_size=2, progress=progress.append)
+
+        self.assertFalse(result.ok)
+        self.assertEqual(result.created, 0)
+        self.assertEqual([e.line for e in result.errors], [3, 4, 5])
+        self.assertEqual(progress, [2, 4])
+        self.assertEqual(Question.objects.filter(video=self.video).count(), 1)
+
+    def test_wrong_header_is_rejected(self):
+        with self.assertRaises(QuestionImportError):
+            import_file(question_csv([], header=['question', 'answer']), self.video)
+
+    def test_form_reads_only_the_header(self):
+        upload = question_csv([question_row(f'Q{i}') for i in range(300)])
+        size = upload.size
+        reads = []
+        original_read = upload.file.read
+
+        def counting_read(*args):
+            data = original_read(*args)
+            reads.append(len(data))
+            return data
+
+        upload.file.read = counting_read
+        form = BulkQuestionImportForm(data={'video': self.video.id}, files={'csv_file': upload})
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertLess(sum(reads), size)  # only the header chunk
+
+        result = import_file(upload, self.video)
+        self.assertEqual(result.created, 300)
+
+    def test_form_rejects_wrong_header(self):
+        upload = question_csv([], header=['question', 'answer'])
+        form = BulkQuestionImportForm(data={'video': self.video.id}, files={'csv_file': upload})
+        self.assertFalse(form.is_valid())
+        self.assertIn('headers', str(form.errors['csv_file']))
+
+    def test_xlsx_upload_goes_through_the_same_import(self):
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.append(QUESTION_HEADERS)
+        sheet.append(question_row('From Excel', correct=3))
+        sheet.append([None] * len(QUESTION_HEADERS))
+        sheet.append(['Numbers', 'single_choice', 4, True, 5, False, None, None, None, None])
+        output = io.BytesIO()
+        workbook.save(output)
+        upload = SimpleUploadedFile('questions.xlsx', output.getvalue())
+
+        form = BulkQuestionImportForm(data={'video': self.video.id}, files={'csv_file': upload})
+        self.assertTrue(form.is_valid(), form.errors)
+        result = import_file(upload, self.video)
+
+        self.assertEqual(result.created, 2)
+        numbers = Question.objects.get(video=self.video, text_raw='Numbers')
+        self.assertEqual([(a.text, a.is_correct) for a in numbers.answers.all()], [('4', True), ('5', False)])
+
+    def test_unsupported_or_broken_files_are_rejected(self):
+        for name in ('questions.txt', 'questions.xlsx'):
+            upload = SimpleUploadedFile(name, b'not a workbook')
+            form = BulkQuestionImportForm(data={'video': self.video.id}, files={'csv_file': upload})
+            self.assertFalse(form.is_valid())
+
+    def test_import_benchmark_leaves_no_rows(self):
+        out = io.StringIO()
+        call_command('benchmark_question_import', rows=20, stdout=out)
+        self.assertIn('XLSX', out.getvalue())
+        self.assertEqual(Video.objects.count(), 1)
+
+
+@override_settings(QUESTION_IMPORT_WORKERS=0)
+class ImportJobTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.video = make_video(1)
+        User.objects.create_superuser('admin', password='pass12345')
+        self.client.login(username='admin', password='pass12345')
+
+    def upload(self, rows):
+        url = reverse('admin:core_video_bulk_import_questions', args=[self.video.id])
+        response = self.client.post(url, {'video': self.video.id, 'csv_file': question_csv(rows)})
+        job = ImportJob.objects.get()
+        self.assertRedirects(response, reverse('admin:core_importjob_progress', args=[job.id]))
+        return job
+
+    def progress(self, job):
+        return self.client.get(reverse('admin:core_importjob_progress_json', args=[job.id])).json()
+
+    def test_upload_returns_before_the_import_runs(self):
+        job = self.upload([question_row('From admin'), question_row('Second')])
+        self.assertEqual(self.progress(job)['status'], 'queued')
+        self.assertFalse(Question.objects.exists())
+
+        out = io.StringIO()
+        call_command('run_import_jobs', stdout=out)
+        self.assertIn('Ran 1 import jobs', out.getvalue())
+        state = self.progress(job)
+        self.assertEqual((state['status'], state['rows_processed'], state['created_count']), ('succeeded', 2, 2))
+        self.assertEqual(Question.objects.filter(video=self.video).count(), 2)
+
+        # A finished job is never claimed again, and its upload is gone
+        job.refresh_from_db()
+        self.assertFalse(job.file)
+        self.assertEqual(os.listdir(os.path.join(settings.MEDIA_ROOT, 'imports')), [])
+        self.assertFalse(run_import_job(job.id))
+        response = self.client.get(reverse('admin:core_importjob_progress', args=[job.id]))
+        self.assertContains(response, 'Succeeded')
+
+    def test_row_errors_are_reported_on_the_job(self):
+        job = self.upload([question_row('fine'), question_row('bad', correct=9)])
+        self.assertTrue(run_import_job(job.id))
+        state = self.progress(job)
+        self.assertEqual(state['status'], 'failed')
+        self.assertEqual(state['errors'], ['Row 3: at least one answer must be marked as correct'])
+        self.assertFalse(Question.objects.exists())
+
+    def make_job(self, **fields):
+        job = ImportJob.objects.create(video=self.video, file=question_csv([question_row('Queued')]))
+        ImportJob.objects.filter(pk=job.pk).update(**fields)
+        job.refresh_from_db()
+        return job
+
+    def test_jobs_left_by_a_stopped_process_are_recovered(self):
+        long_ago = timezone.now() - timedelta(hours=1)
+        stuck = self.make_job(status='running', started_at=long_ago)
+        busy = self.make_job(status='running', started_at=long_ago)
+        leftover = self.make_job(created_at=long_ago)
+        self.make_job()
+        with other_worker():
+            import_jobs._report_progress(busy.id, 40)
+
+        upload_path = stuck.file.path
+        with self.assertLogs('core.import_jobs', 'WARNING') as logs:
+            self.assertEqual(recover_jobs(), [leftover.id])
+        self.assertEqual(logs.output, [f'WARNING:core.import_jobs:Failing question import jobs [{stuck.id}]: their worker stopped'])
+        stuck.refresh_from_db()
+        self.assertEqual((stuck.status, stuck.message), ('failed', import_jobs.INTERRUPTED_MESSAGE))
+        self.assertFalse(stuck.file)
+        self.assertFalse(os.path.exists(upload_path))
+        busy.refresh_from_db()
+        self.assertEqual((busy.status, job_state(busy)['rows_processed']), ('running', 40))
+
+        # Pool mode hands the leftover job to this process's pool, once
+        self.addCleanup(import_jobs._submitted.clear)
+        pool = InlinePool()
+        with override_settings(QUESTION_IMPORT_WORKERS=2), mock.patch('core.import_jobs.get_pool', return_value=pool):
+            sweep_jobs()
+            cache.clear()
+            with self.assertLogs('core.import_jobs', 'WARNING'):
+                sweep_jobs()  # busy's heartbeat went with the cache
+        self.assertEqual([args for _, _, args in pool.jobs], [(leftover.id,)])
+
+        # The command worker picks up both queued jobs
+        self.assertEqual(run_queued_jobs(once=True), 2)
+
+
+class QuestionExportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.first = make_video(1, title='Intro: Basics')
+        self.second = make_video(2, title='Advanced')
+        for order in (1, 2):
+            make_question(self.first, order, correct=order)
+        make_question(self.second, 1)
+        User.objects.create_superuser('admin', password='pass12345')
+        self.client.login(username='admin', password='pass12345')
+
+    def export(self, action, *videos):
+        response = self.client.post(reverse('admin:core_video_changelist'), {
+            'action': action,
+            '_selected_action': [v.id for v in videos],
+        })
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content)
+
+    def test_csv_export_round_trips_through_the_importer(self):
+        response, body = self.export('export_questions_csv', self.first)
+        self.assertIn('questions_intro_basics.csv', response['Content-Disposition'])
+        rows = list(csv.reader(io.StringIO(body.decode())))
+        self.assertEqual(rows[0], QUESTION_HEADERS)
+        self.assertEqual(len(rows), 3)
+
+        copy = make_video(3)
+        result = import_file(SimpleUploadedFile('copy.csv', body), copy)
+        self.assertEqual(result.created, 2)
+        correct = [q.answers.get(is_correct=True).order for q in copy.questions.order_by('order')]
+        self.assertEqual(correct, [1, 2])
+
+    def test_several_videos_export_as_zip_and_workbook(self):
+        _, body = self.export('export_questions_csv', self.first, self.second)
+        with zipfile.ZipFile(io.BytesIO(body)) as archive:
+            self.assertEqual(archive.namelist(), ['questions_intro_basics.csv', 'questions_advanced.csv'])
+            self.assertEqual(len(archive.read('questions_advanced.csv').decode().splitlines()), 2)
+
+        _, body = self.export('export_questions_xlsx', self.first, self.second)
+        workbook = openpyxl.load_workbook(io.BytesIO(body), read_only=True)
+        self.assertEqual(workbook.sheetnames, ['Intro  Basics', 'Advanced'])
+        self.assertEqual(len(list(workbook['Intro  Basics'].iter_rows())), 3)
@@ -0,0 +1,41 @@
+"""
+Signed quiz deadline tokens.
+
+quiz_view hands the page a token carrying the attempt's deadline, signed
+with SECRET_KEY. sync_timer_view can then answer "how long is left" from
+the token and the clock alone, without touching the session or the
+database. Submissions are still checked against the stored start time.
+"""
+import time
+from datetime import timedelta
+
+from django.core import signing
+
+TIMER_SALT = 'core.quiz.timer'
+
+
+def attempt_deadline(progress, video):
+    return progress.started_at + timedelta(seconds=video.quiz_timer_seconds)
+
+
+def issue_timer_token(progress, video):
+    return signing.dumps({
+        'v': video.id,
+        'a': progress.current_attempt_id,
+        'd': attempt_deadline(progress, video).timestamp(),
+    }, salt=TIMER_SALT)
+
+
+def read_timer_token(token, video_id):
+    """Return the deadline (a UNIX timestamp) in a token, or None if it is not valid for this video"""
+    try:
+        data = signing.loads(token, salt=TIMER_SALT)
+    except signing.BadSignature:
+        return None
+    if data.get('v') != int(video_id):
+        return None
+    return data.get('d')
+
+
+def remaining_seconds(deadline):
+    return max(0, int(deadline - time.time()))
@@ -0,0 +1,81 @@
+"""
+Server-Sent Events timer channel.
+
+A plain ASGI app, mounted in ``videoquiz/asgi.py`` ahead of Django, that
+streams the remaining time of a quiz attempt to the page over one
+long-lived connection and sends an ``expired`` event when the deadline
+passes. It authenticates with the signed deadline token from
+``core.timer`` only, so each open quiz costs one idle coroutine and no
+database or session access. The JSON sync-timer endpoint is kept for
+WSGI deployments and browsers without EventSource.
+"""
+import asyncio
+import json
+import re
+from urllib.parse import parse_qs
+
+from django.conf import settings
+from django.urls import reverse
+
+from .timer import read_timer_token, remaining_seconds
+
+TIMER_STREAM_PATH = re.compile(r'^/quiz/(?P<video_id>\d+)/timer-stream/$')
+
+
+def _event(name, data):
+    return f'event: {name}\ndata: {json.dumps(data)}\n\n'.encode()
+
+
+async def _send_error(send, status, message):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json')],
+    })
+    await send({'type': 'http.response.body', 'body': json.dumps({'error': message}).encode()})
+
+
+async def timer_stream_app(scope, receive, send):
+    match = TIMER_STREAM_PATH.match(scope['path'])
+    video_id = int(match.group('video_id'))
+    token = parse_qs(scope.get('query_string', b'').decode()).get('token', [''])[0]
+    deadline = read_timer_token(token, video_id) if token else None
+    if deadline is None:
+        await _send_error(send, 400, 'Invalid timer token')
+        return
+
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [
+            (b'content-type', b'text/event-stream'),
+            (b'cache-control', b'no-cache'),
+            (b'x-accel-buffering', b'no'),
+        ],
+    })
+
+    interval = getattr(settings, 'QUIZ_TIMER_STREAM_INTERVAL', 15)
+    disconnected = asyncio.ensure_future(_wait_for_disconnect(receive))
+    try:
+        while True:
+            remaining = remaining_seconds(deadline)
+            await send({'type': 'http.response.body', 'body': _event('tick', {'remaining': remaining}), 'more_body': True})
+            if remaining <= 0:
+                await send({
+                    'type': 'http.response.body',
+                    'body': _event('expired', {'auto_submit_url': reverse('auto_submit_quiz', args=[video_id])}),
+                })
+                return
+            # Sleep until the next tick or the deadline, whichever is sooner
+            await asyncio.wait([disconnected], timeout=min(interval, remaining))
+            if disconnected.done():
+                return
+    finally:
+        disconnected.cancel()
+
+
+async def _wait_for_disconnect(receive):
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return
@@ -19,8 +19,10 @@ urlpatterns = [
     path('quiz/<int:video_id>/submit/', views.submit_quiz_view, name='submit_quiz'),
     path('quiz/<int:video_id>/retry/', views.retry_quiz_view, name='retry_quiz'),
     path('certificate/', views.certificate_view, name='certificate'),
+    path('certificate/status/', views.certificate_status_view, name='certificate_status'),
     path('quiz/<int:video_id>/auto-submit/', views.auto_submit_quiz, name='auto_submit_quiz'),
     path('quiz/<int:video_id>/sync-timer/', views.sync_timer_view, name='sync_timer'),
     path('quiz/<int:video_id>/get-question/', views.get_question_data, name='get_question_data'),
     path('quiz/<int:video_id>/save-answer/', views.save_answer_view, name='save_answer'),
+    path('quiz/<int:video_id>/payload/', views.quiz_payload_view, name='quiz_payload'),
 ]
@@ -2,17 +2,29 @@ from django.contrib.auth import authenticate, login, logout
 from django.contrib.messages import get_messages
 from django.contrib.auth.decorators import login_required
 from .forms import RegisterForm
-from .models import Video, Question, Answer, VideoProgress, Certificate
+from .models import Video, VideoProgress
+from .dashboard import build_dashboard
+from .stats import user_course_summary
+from .certificates import certificate_response, latest_certificate, user_certificate
+from .certificate_jobs import FAILED, READY, enqueue_certificate, job_status
+from .quiz_bundle import get_quiz_bundle
+from .outline import get_course_outline
+from .prerequisites import prerequisites_met
+from .grading import grade_answers, record_grade, result_rows, results_from_snapshot
+from .attempts import attempt_answers, open_attempt, start_attempt
+from .answer_buffer import current_answers, discard_buffer, flush_answers, save_answer
+from .answered import answered_count, mark_answered
+from .timer import attempt_deadline, issue_timer_token, read_timer_token, remaining_seconds
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.utils import timezone
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, Http404
 from django.contrib import messages
-from reportlab.pdfgen import canvas
-import io
-from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
 from django.views.decorators.csrf import csrf_exempt
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 import json
+import hashlib
 
 def register_view(request):
     if request.method == 'GET':
@@ -52,109 +64,9 @@ def logout_view(request):
 @login_required
 def dashboard_view(request):
     user = request.user
-    videos = Video.objects.filter(is_active=True, status='published').order_by('order')
-    video_progress = VideoProgress.objects.filter(user=user)
-
-    # Calculate overall statistics
-    total_videos = videos.count()
-    passed_count = video_progress.filter(status='passed').count()
-    failed_count = video_progress.filter(status__in=['failed', 'timeout']).count()
-    not_attempted_count = total_videos - video_progress.count()
-    
-    # Calculate average score and completion percentage
-    completed_progress = video_progress.filter(status__in=['passed', 'failed', 'timeout'])
-    average_score = 0
-    if completed_progress.exists():
-        total_percentage = sum([p.percentage for p in completed_progress])
-        average_score = total_percentage / completed_progress.count()
-    
-    completion_percentage = (passed_count / total_videos * 100) if total_videos > 0 else 0
-    
-    # Calculate total retries remaining
-    total_retries_remaining = 0
-    for video in videos:
-        progress = video_progress.filter(video=video).first()
-        if progress:
-            retries_left = video.max_attempts - progress.attempts
-            total_retries_remaining += max(0, retries_left)
-        else:
-            total_retries_remaining += video.max_attempts
-
-    # Check if all videos are passed for certificate eligibility
-    all_passed = passed_count == total_videos
-
-    # Build video data with status logic
-    video_data = []
-    for index, video in enumerate(videos):
-        progress = video_progress.filter(video=video).first()
-        
-        # Determine if video is unlocked
-        is_unlocked = True
-        if index > 0:  # Video 1 is always unlocked
-            previous_video = videos[index - 1]
-            prev_progress = video_progress.filter(video=previous_video).first()
-            is_unlocked = prev_progress and prev_progress.status == 'passed'
-        
-        # Determine status and button states
-        if not is_unlocked:
-            status = 'locked'
-            can_start = False
-            can_retry = False
-        elif progress and progress.attempts >= video.max_attempts and progress.status != 'passed':
-            status = 'max_attempts'
-            can_start = False
-            can_retry = False
-        elif not progress:
-            status = 'not_attempted'
-            can_start = True
-            can_retry = False
-        elif progress.status == 'in_progress':
-            status = 'in_progress'
-            can_start = True
-            can_retry = False
-        elif progress.status == 'passed':
-            status = 'passed'
-            can_start = False
-            can_retry = False
-        else:  # failed or timeout
-            status = 'failed'
-            can_start = False
-            can_retry = progress.attempts < video.max_attempts
-        
-        # Calculate attempts and retries
-        attempts_used = progress.attempts if progress else 0
-        retries_remaining = video.max_attempts - attempts_used
-        
-        video_data.append({
-            'video': video,
-            'status': status,
-            'is_unlocked': is_unlocked,
-            'can_start': can_start,
-            'can_retry': can_retry,
-            'attempts_used': attempts_used,
-            'max_attempts': video.max_attempts,
-            'retries_remaining': max(0, retries_remaining),
-            'score': progress.score if progress and progress.status in ['passed', 'failed', 'timeout'] else None,
-            'percentage': progress.percentage if progress and progress.status in ['passed', 'failed', 'timeout'] else None,
-            'best_score': progress.best_score if progress else 0,
-        })
-
-    stats = {
-        'total_videos': total_videos,
-        'passed_count': passed_count,
-        'failed_count': failed_count,
-        'not_attempted_count': not_attempted_count,
-        'total_retries_remaining': total_retries_remaining,
-        'average_score': round(average_score, 1),
-        'completion_percentage': round(completion_percentage, 1),
-    }
-
-    return render(request, 'core/dashboard.html', {
-        'video_data': video_data,
-        'stats': stats,
-        'user': user,
-        'all_passed': all_passed,
-    })
+    context = build_dashboard(user)
+    context['user'] = user
+    return render(request, 'core/dashboard.html', context)
 
 @login_required
 def quiz_view(request, video_id):
@@ -163,38 +75,38 @@ def quiz_view(request, video_id):
 
     user = request.user
     video = get_object_or_404(Video, id=video_id, is_active=True)
-    progress, created = VideoProgress.objects.get_or_create(user=user, video=video)
+    if not prerequisites_met(user, video.id):
+        messages.error(request, "You must complete previous videos first.")
+        return redirect('dashboard')
+
+    progress, created = VideoProgress.objects.select_related('current_attempt').get_or_create(user=user, video=video)
 
-    # Only increment attempt when a new attempt is explicitly started
+    # Only start a new attempt when one is explicitly started
     if progress.status not in ['in_progress', 'passed']:
         if progress.attempts >= video.max_attempts:
             messages.error(request, f"You have reached the maximum number of attempts ({video.max_attempts}) for this quiz.")
             return redirect('dashboard')
-        progress.attempts += 1
-        progress.started_at = timezone.now()
-        progress.status = 'in_progress'
-        progress.answers = {}
-        progress.save()
+        start_attempt(progress, video)
 
     # Already passed
     if progress.status == 'passed':
         messages.info(request, "You have already passed this quiz.")
         return redirect('quiz_result', video_id=video.id)
 
-    videos = list(Video.objects.filter(is_active=True, status='published').order_by('order'))
-    current_index = videos.index(video) + 1
-    total_videos = len(videos)
+    outline = get_course_outline()
+    current_index = outline.position(video.id)
+    total_videos = len(outline)
 
-    questions = Question.objects.filter(video=video, is_active=True).order_by('order')
-    if not questions.exists():
+    bundle = get_quiz_bundle(video.id)
+    questions = bundle.questions
+    if not questions:
         messages.error(request, "No questions available for this video.")
         return redirect('dashboard')
 
-    q_index = int(request.GET.get('q', 1)) - 1
-    q_index = max(0, min(q_index, questions.count() - 1))
-
-    question = questions[q_index]
-    answers = Answer.objects.filter(question=question).order_by('order')
+    attempt = progress.current_attempt
+    q_index = bundle.clamp_index(int(request.GET.get('q', 1)) - 1)
+    question, prev_index, next_index = bundle.navigation(q_index)
+    answers = question.answers
 
     # Timer logic
     time_limit = video.quiz_timer_seconds
@@ -209,13 +121,13 @@ def quiz_view(request, video_id):
         selected_answer = request.POST.get('selected_answer')
         question_id = request.POST.get('question_id')
 
-        if question_id and selected_answer:
-            progress.answers[str(question_id)] = int(selected_answer)
-            progress.save()
+        if question_id and selected_answer and bundle.is_valid_answer(question_id, int(selected_answer)):
+            save_answer(attempt, int(question_id), int(selected_answer))
 
         # Submit
         if 'submit-btn' in request.POST:
-            unanswered = [q.order for q in questions if str(q.id) not in progress.answers]
+            answered = current_answers(attempt)
+            unanswered = [q.order for q in questions if q.id not in answered]
             if unanswered:
                 messages.error(request, f"Please answer all questions. Unanswered: {', '.join(map(str, unanswered))}")
             else:
@@ -231,17 +143,19 @@ def quiz_view(request, video_id):
         'video': video,
         'video_position': current_index,
         'progress': progress,
+        'selected_answer_id': current_answers(attempt).get(question.id),
         'remaining': remaining,
+        'timer_token': issue_timer_token(progress, video),
         'video_total': total_videos,
         'question': question,
         'answers': answers,
         'q_index': q_index,
-        'total_questions': questions.count(),
-        'prev_index': q_index - 1 if q_index > 0 else None,
-        'next_index': q_index + 1 if q_index < questions.count() - 1 else None,
+        'total_questions': len(questions),
+        'prev_index': prev_index,
+        'next_index': next_index,
         'attempts_left': video.max_attempts - progress.attempts,
         'max_attempts': video.max_attempts,
-        'question_range': range(questions.count()),
+        'question_range': range(len(questions)),
     })
 
 @login_required
@@ -249,195 +163,90 @@ def auto_submit_quiz(request, video_id):
     """Auto-submit quiz when timer expires"""
     user = request.user
     video = get_object_or_404(Video, id=video_id)
-    progress = VideoProgress.objects.get(user=user, video=video)
-    
-    if progress.status != 'in_progress':
+    progress = VideoProgress.objects.select_related('current_attempt').get(user=user, video=video)
+    attempt = open_attempt(progress)
+
+    if attempt is None:
         return redirect('quiz_result', video_id=video.id)
     
-    questions = Question.objects.filter(video=video, is_active=True).order_by('order')
-    
     # Grade quiz WITHOUT points system
-    correct = 0
-    for q in questions:
-        user_ans_id = progress.answers.get(str(q.id))
-        if user_ans_id and Answer.objects.filter(id=user_ans_id, question=q, is_correct=True).exists():
-            correct += 1
-
-    percentage = (correct / questions.count() * 100) if questions.count() > 0 else 0
-    progress.score = correct
-    progress.percentage = percentage
-    progress.ended_at = timezone.now()
-    progress.status = 'timeout'
-    progress.passed = percentage >= video.passing_score
-
-    # Update best score
-    if percentage > progress.best_score:
-        progress.best_score = int(percentage)
-
-    progress.save()
-    messages.warning(request, "Time expired! Quiz has been automatically submitted.")
+    flush_answers(attempt)
+    grade = grade_answers(get_quiz_bundle(video.id), attempt_answers(attempt))
+    if record_grade(progress, video, grade, status='timeout'):
+        messages.warning(request, "Time expired! Quiz has been automatically submitted.")
+    discard_buffer(attempt)
     return redirect('quiz_result', video_id=video.id)
 
 @login_required
 def certificate_view(request):
     user = request.user
-    videos = Video.objects.filter(is_active=True, status='published').order_by('order')
-    video_progress = VideoProgress.objects.filter(user=user, video__in=videos)
-    
-    if video_progress.count() != videos.count() or any(vp.status != 'passed' for vp in video_progress):
+    if not user_course_summary(user)['all_passed']:
         messages.error(request, "You must pass all quizzes to download the certificate.")
         return redirect('dashboard')
 
-    # Check if certificate already exists
-    certificate, created = Certificate.objects.get_or_create(user=user)
-
-    buffer = io.BytesIO()
-    p = canvas.Canvas(buffer, pagesize=A4)
-    width, height = A4
-
-    # Colors
-    main_color = colors.HexColor("#2B3A67")  # Deep blue
-    accent_color = colors.HexColor("#F7C873")  # Gold/yellow
-    name_bg_color = colors.HexColor("#F7C873")
-    white = colors.white
-
-    # Border
-    p.setStrokeColor(main_color)
-    p.setLineWidth(8)
-    p.rect(30, 30, width-60, height-60)
-
-    # Header bar
-    p.setFillColor(main_color)
-    p.rect(30, height-120, width-60, 60, fill=1, stroke=0)
-
-    # Title
-    p.setFont("Helvetica-Bold", 32)
-    p.setFillColor(white)
-    p.drawCentredString(width/2, height-80, "Certificate of Achievement")
-
-    # Subtitle
-    p.setFont("Helvetica", 16)
-    p.setFillColor(main_color)
-    p.drawCentredString(width/2, height-150, "This is to certify that")
-
-    # Name box
-    name = user.get_full_name() or user.username
-    name_box_width = 400
-    name_box_height = 40
-    name_box_x = (width - name_box_width) / 2
-    name_box_y = height-200
-    p.setFillColor(name_bg_color)
-    p.roundRect(name_box_x, name_box_y, name_box_width, name_box_height, 10, fill=1, stroke=0)
-    p.setFont("Helvetica-Bold", 22)
-    p.setFillColor(main_color)
-    p.drawCentredString(width/2, name_box_y + name_box_height/2 + 7, name)
-
-    # Statement
-    p.setFont("Helvetica", 16)
-    p.setFillColor(main_color)
-    p.drawCentredString(width/2, name_box_y - 30, "has successfully completed all video quizzes.")
-
-    # Course info
-    p.setFont("Helvetica-Oblique", 14)
-    p.drawCentredString(width/2, name_box_y - 55, f"Completed {videos.count()} video quizzes with passing scores")
-
-    # Decorative line
-    p.setStrokeColor(accent_color)
-    p.setLineWidth(2)
-    p.line(width/2-120, name_box_y - 80, width/2+120, name_box_y - 80)
-
-    # Date and signature
-    p.setFont("Helvetica", 12)
-    p.setFillColor(main_color)
-    p.drawString(80, 100, f"Date: {certificate.issue_date.strftime('%Y-%m-%d')}")
-    p.drawRightString(width-80, 100, "Video Quiz Administrator")
-
-    # Signature line
-    p.setStrokeColor(main_color)
-    p.setLineWidth(1)
-    p.line(width-220, 110, width-80, 110)
-
-    # Certificate ID
-    p.setFont("Helvetica", 8)
-    p.setFillColor(colors.gray)
-    p.drawCentredString(width/2, 50, f"Certificate ID: VQ-{user.id}-{certificate.id}")
-
-    p.showPage()
-    p.save()
-    buffer.seek(0)
-    
-    return HttpResponse(buffer, content_type='application/pdf', headers={
-        'Content-Disposition': f'attachment; filename="certificate_{user.username}.pdf"'
+    certificate = user_certificate(user)
+    status = enqueue_certificate(user, certificate)
+    if status == READY:
+        certificate.refresh_from_db(fields=['file', 'fingerprint'])
+        return certificate_response(request, certificate, f"certificate_{user.username}.pdf")
+    if status == FAILED:
+        messages.error(request, "We couldn't prepare your certificate. Please try again in a minute.")
+        return redirect('dashboard')
+
+    # Rendering in the background; the page polls the status URL
+    return render(request, 'core/certificate_pending.html', {
+        'status_url': reverse('certificate_status'),
+        'download_url': reverse('certificate'),
+    }, status=202)
+
+@login_required
+def certificate_status_view(request):
+    certificate = latest_certificate(request.user)
+    return JsonResponse({
+        'status': job_status(request.user, certificate),
+        'download_url': reverse('certificate'),
     })
 
 @login_required
 def submit_quiz_view(request, video_id):
     video = get_object_or_404(Video, id=video_id)
-    progress = get_object_or_404(VideoProgress, user=request.user, video=video)
+    progress = get_object_or_404(VideoProgress.objects.select_related('current_attempt'), user=request.user, video=video)
+    attempt = open_attempt(progress)
 
-    if progress.status not in ['in_progress']:
+    if attempt is None:
         return redirect('quiz_result', video_id=video_id)
 
-    questions = Question.objects.filter(video=video, is_active=True)
-
-    # Grade
-    correct_count = 0
-    for question in questions:
-        user_answer_id = progress.answers.get(str(question.id))
-        if user_answer_id and Answer.objects.filter(id=user_answer_id, question=question, is_correct=True).exists():
-            correct_count += 1
-
-    percentage = (correct_count / questions.count() * 100) if questions.exists() else 0
-
-    # Update progress
-    progress.score = correct_count
-    progress.percentage = percentage
-    progress.status = 'passed' if percentage >= video.passing_score else 'failed'
-    progress.passed = percentage >= video.passing_score
-    progress.ended_at = timezone.now()
-
-    if percentage > progress.best_score:
-        progress.best_score = int(percentage)
-
-    progress.save()
+    # Grade and update progress
+    flush_answers(attempt)
+    grade = grade_answers(get_quiz_bundle(video.id), attempt_answers(attempt))
+    record_grade(progress, video, grade)
+    discard_buffer(attempt)
 
     return redirect('quiz_result', video_id=video_id)
 
 @login_required
 def quiz_result_view(request, video_id):
     video = get_object_or_404(Video, id=video_id)
-    progress = VideoProgress.objects.get(user=request.user, video=video)
-    questions = Question.objects.filter(video=video, is_active=True).order_by('order')
-    user_answers = progress.answers  # dict {question_id: answer_id}
-    results = []
-    correct_count = 0
-
-    for question in questions:
-        user_answer_id = user_answers.get(str(question.id))
-        correct_answer = Answer.objects.filter(question=question, is_correct=True).first()
-        user_answer = Answer.objects.filter(id=user_answer_id).first() if user_answer_id else None
-        is_correct = str(correct_answer.id) == str(user_answer_id) if correct_answer else False
-        
-        if is_correct:
-            correct_count += 1
-            
-        results.append({
-            'question': question,
-            'user_answer': user_answer,
-            'correct_answer': correct_answer,
-            'is_correct': is_correct,
-        })
+    progress = VideoProgress.objects.select_related('current_attempt').get(user=request.user, video=video)
+    attempt = progress.current_attempt
+    bundle = get_quiz_bundle(video.id)
+
+    # Render from the snapshot stored at grading time; an attempt that is
+    # still open is graded on the fly.
+    if attempt and attempt.results and attempt.status != 'in_progress':
+        graded = results_from_snapshot(attempt.results)
+    else:
+        graded = grade_answers(bundle, current_answers(attempt)).results
+    results = result_rows(bundle, graded)
 
     # Check if all videos are passed for certificate eligibility
-    all_videos = Video.objects.filter(is_active=True, status='published').order_by('order')
-    all_progress = VideoProgress.objects.filter(user=request.user, video__in=all_videos)
-    all_passed = all_progress.count() == all_videos.count() and all(vp.status == 'passed' for vp in all_progress)
+    all_passed = user_course_summary(request.user)['all_passed']
 
     return render(request, 'core/quiz_result.html', {
         'video': video,
         'results': results,
-        'score': correct_count,
-        'total': questions.count(),
+        'score': sum(1 for r in graded if r.is_correct),
+        'total': len(graded),
         'percentage': progress.percentage,
         'status': progress.status,
         'progress': progress,
@@ -453,21 +262,7 @@ def video_detail_view(request, video_id):
     progress, created = VideoProgress.objects.get_or_create(user=request.user, video=video)
     
     # Check if user can access this video (sequential access)
-    videos = Video.objects.filter(is_active=True, status='published').order_by('order')
-    video_list = list(videos)
-    current_index = video_list.index(video)
-    
-    # Check if previous videos are completed
-    can_access = True
-    if current_index > 0:
-        previous_videos = video_list[:current_index]
-        for prev_video in previous_videos:
-            prev_progress = VideoProgress.objects.filter(user=request.user, video=prev_video).first()
-            if not prev_progress or prev_progress.status != 'passed':
-                can_access = False
-                break
-    
-    if not can_access:
+    if not prerequisites_met(request.user, video.id):
         messages.error(request, "You must complete previous videos first.")
         return redirect('dashboard')
     
@@ -487,19 +282,21 @@ def save_answer_view(request, video_id):
             selected_answer = int(data.get('selected_answer'))
 
             video = get_object_or_404(Video, id=video_id)
-            question = get_object_or_404(Question, id=question_id, video=video)
-            Answer.objects.get(id=selected_answer, question=question)  # Ensure valid
+            bundle = get_quiz_bundle(video.id)
+            if not bundle.is_valid_answer(question_id, selected_answer):
+                raise Http404("No matching answer for this question.")  # Ensure valid
 
-            progress, _ = VideoProgress.objects.get_or_create(user=request.user, video=video)
-            progress.answers[question_id] = selected_answer
-            progress.save()
+            progress = VideoProgress.objects.select_related('current_attempt').filter(user=request.user, video=video).first()
+            attempt = open_attempt(progress)
+            if attempt is None:
+                return JsonResponse({'success': False, 'error': 'Quiz not started'}, status=400)
+            save_answer(attempt, int(question_id), selected_answer)
 
             # ✅ Count how many are answered
-            questions = Question.objects.filter(video=video, is_active=True)
-            answered_count = sum(1 for q in questions if str(q.id) in progress.answers)
+            answered = mark_answered(attempt, bundle, int(question_id))
             return JsonResponse({
                 "success": True,
-                "answered_count": answered_count,
+                "answered_count": answered,
             })
         
         except Exception as e:
@@ -521,18 +318,27 @@ def retry_quiz_view(request, video_id):
         messages.info(request, "You have already passed this quiz.")
         return redirect('quiz_result', video_id=video.id)
     
-    # Reset progress for retry
+    # Reset the summary; the next attempt is inserted when the quiz starts
     progress.started_at = None
-    progress.answers = {}
     progress.status = 'not_attempted'
     progress.ended_at = None
-    progress.save()
+    progress.save(update_fields=['started_at', 'status', 'ended_at', 'last_attempt'])
     
     messages.info(request, f"Starting attempt {progress.attempts + 1} of {video.max_attempts}")
     return redirect('quiz', video_id=video.id)
 
-@login_required
 def sync_timer_view(request, video_id):
+    # Pages that carry a signed deadline are answered without a session or DB lookup
+    token = request.GET.get('token')
+    if token:
+        deadline = read_timer_token(token, video_id)
+        if deadline is None:
+            return JsonResponse({'error': 'Invalid timer token'}, status=400)
+        return JsonResponse({'remaining': remaining_seconds(deadline)})
+    return _sync_timer_from_progress(request, video_id)
+
+@login_required
+def _sync_timer_from_progress(request, video_id):
     user = request.user
     video = get_object_or_404(Video, id=video_id)
     progress = VideoProgress.objects.filter(user=user, video=video).first()
@@ -552,22 +358,23 @@ def get_question_data(request, video_id):
         try:
             q_index = int(request.GET.get('q_index', 0))
             video = get_object_or_404(Video, id=video_id)
-            questions = Question.objects.filter(video=video, is_active=True).order_by('order')
-            question = questions[q_index]
-            answers = Answer.objects.filter(question=question).order_by('order')
+            bundle = get_quiz_bundle(video.id)
+            question, prev_index, next_index = bundle.navigation(q_index)
+            answers = question.answers
 
-            progress = VideoProgress.objects.get(user=request.user, video=video)
-            selected_id = progress.answers.get(str(question.id), None)
+            progress = VideoProgress.objects.select_related('current_attempt').get(user=request.user, video=video)
+            answers_so_far = current_answers(progress.current_attempt)
+            selected_id = answers_so_far.get(question.id, None)
 
             # ✅ Add this to count how many questions are answered
-            answered_count = sum(1 for q in questions if str(q.id) in progress.answers)
+            answered = answered_count(progress.current_attempt, bundle, answers_so_far)
 
             return JsonResponse({
                 'question_text': question.text_raw,
                 'question_id': question.id,
                 'q_index': q_index,
-                'total_questions': questions.count(),
-                'answered_count': answered_count,
+                'total_questions': len(bundle),
+                'answered_count': answered,
                 'answers': [
                     {
                         'id': a.id,
@@ -575,11 +382,41 @@ def get_question_data(request, video_id):
                         'is_selected': (a.id == selected_id)
                     } for a in answers
                 ],
-                'prev_index': q_index - 1 if q_index > 0 else None,
-                'next_index': q_index + 1 if q_index < questions.count() - 1 else None,
+                'prev_index': prev_index,
+                'next_index': next_index,
             })
 
         except IndexError:
             return JsonResponse({'error': 'Invalid question index.'}, status=400)
         except Exception as e:
-            return JsonResponse({'error': str(e)}, status=500)
\ No newline at end of file
+            return JsonResponse({'error': str(e)}, status=500)
+
+@login_required
+def quiz_payload_view(request, video_id):
+    """The whole open attempt in one response so the page can navigate locally"""
+    progress = (
+        VideoProgress.objects.select_related('current_attempt', 'video')
+        .filter(user=request.user, video_id=video_id).first()
+    )
+    attempt = open_attempt(progress)
+    if attempt is None:
+        return JsonResponse({'error': 'Quiz not started'}, status=400)
+
+    bundle = get_quiz_bundle(video_id)
+    selections = current_answers(attempt)
+    digest = hashlib.md5(json.dumps(sorted(selections.items())).encode(), usedforsecurity=False).hexdigest()
+    etag = quote_etag(f'{bundle.version}-{attempt.id}-{digest[:12]}')
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    response = JsonResponse({
+        'version': bundle.version,
+        'attempt': attempt.id,
+        'deadline': attempt_deadline(progress, progress.video).timestamp(),
+        'questions': bundle.client_questions(),
+        'selections': {str(question_id): answer_id for question_id, answer_id in selections.items()},
+    })
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
\ No newline at end of file
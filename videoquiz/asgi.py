@@ -2,6 +2,8 @@
 ASGI config for videoquiz project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Quiz timer streams (``/quiz/<id>/timer-stream/``) are served by
+``core.timer_stream`` directly; everything else goes to Django.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -13,4 +15,13 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'videoquiz.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from core.timer_stream import TIMER_STREAM_PATH, timer_stream_app  # noqa: E402  (needs Django set up)
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'http' and TIMER_STREAM_PATH.match(scope['path']):
+        await timer_stream_app(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
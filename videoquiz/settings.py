@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -139,3 +140,35 @@ MEDIA_ROOT = BASE_DIR / 'media'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Quiz bundles, the course outline, progress snapshots and the job queues keep
+# their state in the cache, so it must be one store shared by every worker
+# process; a per-process LocMemCache would let workers serve stale answer
+# keys. Point REDIS_URL at the site's Redis. With write-behind answers on,
+# Redis must not evict them: use maxmemory-policy noeviction or volatile-*.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/1'),
+    }
+}
+
+# Buffer quiz answer clicks in the cache and write them to the database in
+# batches (see core/answer_buffer.py). Needs a Redis cache that does not evict
+# keys; the core.E001 system check refuses other caches.
+QUIZ_ANSWER_WRITE_BEHIND = False
+QUIZ_ANSWER_FLUSH_INTERVAL = 30  # seconds
+
+# Seconds between remaining-time events on the SSE timer stream (core/timer_stream.py)
+QUIZ_TIMER_STREAM_INTERVAL = 15
+
+# Seconds past the deadline before expire_quiz_attempts closes an attempt (core/expiry.py)
+QUIZ_EXPIRY_GRACE_SECONDS = 30
+
+# Processes that render certificate PDFs in the background (core/certificate_jobs.py).
+# 0 renders them inside the request instead.
+CERTIFICATE_RENDER_WORKERS = 2
+
+# Threads that run bulk question imports in the web process (core/import_jobs.py).
+# 0 leaves queued imports to the run_import_jobs management command.
+QUESTION_IMPORT_WORKERS = 2